@@ -2,12 +2,662 @@ import sublime
 import sublime_plugin
 import re
 import json
+import html
+import bisect
 import os
+import sys
+import time
+import tempfile
+from array import array
+
+ENGINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'standalone-script')
+if ENGINE_DIR not in sys.path:
+    sys.path.insert(0, ENGINE_DIR)
+
+from sensitive_text_processor import (
+    PatternCache, get_prefilter, is_line_local, load_mapping, locate_entries, redact_stream, ruleset_hash,
+    select_patterns, stream_window, write_mapping
+)
+
+SCAN_CHUNK_SIZE = 256 * 1024
+PROGRESS_INTERVAL = 0.2
+MASK_RESCAN_DELAY = 100
+MASK_BATCH_SIZE = 256 * 1024
+STATUS_KEY = 'sensitive_text_hider'
+SETTINGS_FILE = 'SensitiveTextHider.sublime-settings'
+MASK_KEY = 'sensitive_text_mask'
+FINDINGS_KEY = 'sensitive_text_findings'
+HIDDEN_KEY = 'sensitive_text_hidden'
+DEFAULT_MEMORY_LIMIT_MB = 64
+PENDING_KEY = 'sensitive_text_pending'
+RULE_SET_CACHE_SIZE = 32
 
 sensitive_mappings = {}
+scan_jobs = {}
+mask_states = {}
+save_states = {}
+rules = None
+rule_sets = PatternCache(RULE_SET_CACHE_SIZE)
+
+class ScanCancelled(Exception):
+    pass
+
+class DiscardOutput:
+    def write(self, text):
+        pass
+
+def redacted_regions(replacements):
+    shift = 0
+    for entry in replacements:
+        start = entry['start'] + shift
+        yield start, start + len(entry['replacement']), entry
+        shift += len(entry['replacement']) - (entry['end'] - entry['start'])
+
+def restore_regions(view, edit, replacements):
+    regions = list(redacted_regions(replacements))
+    for start, end, entry in regions:
+        if view.substr(sublime.Region(start, end)) != entry['replacement']:
+            return False
+    
+    for start, end, entry in reversed(regions):
+        view.replace(edit, sublime.Region(start, end), entry['original'])
+    return True
+
+def merge_replacements(content, hidden, entries):
+    pieces = []
+    merged = []
+    pos = 0
+    shift = 0
+    index = 0
+    for start, end, entry in list(redacted_regions(hidden)) + [(len(content), len(content), None)]:
+        while index < len(entries) and entries[index]['start'] < start:
+            new = entries[index]
+            if new['start'] < pos or new['end'] > start:
+                return None
+            merged.append(dict(new, start=new['start'] + shift, end=new['end'] + shift))
+            index += 1
+        pieces.append(content[pos:start])
+        if entry is None:
+            break
+        if content[start:end] != entry['replacement']:
+            return None
+        pieces.append(entry['original'])
+        merged.append(entry)
+        pos = end
+        shift = entry['end'] - end
+    return ''.join(pieces), merged
+
+def backup_enabled():
+    return sublime.load_settings(SETTINGS_FILE).get('create_backup', True)
+
+def write_backup(file_name, content):
+    backup_file = file_name + '.sensitive_backup'
+    if backup_enabled():
+        with open(backup_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+    elif os.path.exists(backup_file):
+        os.remove(backup_file)
+
+def record_hidden(file_name, content, entries):
+    backup_file = file_name + '.sensitive_backup'
+    mapping_file = file_name + '.sensitive_map'
+    
+    if os.path.exists(backup_file) or os.path.exists(mapping_file):
+        try:
+            hidden = load_mapping(mapping_file)
+        except (OSError, ValueError):
+            return False
+        result = merge_replacements(content, hidden, entries)
+        if result is None:
+            return False
+        content, entries = result
+    
+    write_backup(file_name, content)
+    with open(mapping_file, 'w', encoding='utf-8') as f:
+        write_mapping(locate_entries(content, entries), f)
+    return True
+
+class HiddenSpans:
+    __slots__ = ('starts', 'ends', 'labels', 'label_index', 'originals', 'spill_path')
+    
+    def __init__(self, entries):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.labels = []
+        self.label_index = array('I')
+        self.spill_path = None
+        lookup = {}
+        originals = []
+        for entry in entries:
+            self.starts.append(entry['start'])
+            self.ends.append(entry['end'])
+            label = entry['replacement']
+            if label not in lookup:
+                lookup[label] = len(self.labels)
+                self.labels.append(label)
+            self.label_index.append(lookup[label])
+            originals.append(entry['original'])
+        self.originals = ''.join(originals)
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    def __iter__(self):
+        self.load()
+        offset = 0
+        for start, end, label in zip(self.starts, self.ends, self.label_index):
+            yield {
+                'start': start,
+                'end': end,
+                'original': self.originals[offset:offset + end - start],
+                'replacement': self.labels[label]
+            }
+            offset += end - start
+    
+    def nbytes(self):
+        if self.spill_path:
+            return 0
+        arrays = (self.starts, self.ends, self.label_index)
+        return sum(len(a) * a.itemsize for a in arrays) + sys.getsizeof(self.originals)
+    
+    def spill(self):
+        if self.spill_path:
+            return
+        fd, path = tempfile.mkstemp(prefix='sensitive_text_', suffix='.spill')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'starts': self.starts.tolist(),
+                'ends': self.ends.tolist(),
+                'label_index': self.label_index.tolist(),
+                'originals': self.originals
+            }, f)
+        self.spill_path = path
+        self.starts = array('q')
+        self.ends = array('q')
+        self.label_index = array('I')
+        self.originals = ''
+    
+    def load(self):
+        if not self.spill_path:
+            return
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.starts = array('q', data['starts'])
+        self.ends = array('q', data['ends'])
+        self.label_index = array('I', data['label_index'])
+        self.originals = data['originals']
+        self.discard()
+        enforce_memory_limit(keep=self)
+    
+    def discard(self):
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+
+def enforce_memory_limit(keep=None):
+    settings = sublime.load_settings(SETTINGS_FILE)
+    limit = settings.get('unsaved_memory_limit_mb', DEFAULT_MEMORY_LIMIT_MB) * 1024 * 1024
+    stored = [mapping['spans'] for mapping in sensitive_mappings.values() if 'spans' in mapping]
+    total = sum(spans.nbytes() for spans in stored)
+    if keep is not None and all(spans is not keep for spans in stored):
+        total += keep.nbytes()
+    for spans in stored:
+        if total <= limit:
+            break
+        if spans is keep:
+            continue
+        total -= spans.nbytes()
+        spans.spill()
+
+def forget_mapping(view_id):
+    mapping = sensitive_mappings.pop(view_id, None)
+    if mapping and 'spans' in mapping:
+        mapping['spans'].discard()
+
+def restore_tracked(view, edit, regions, spans):
+    entries = list(spans)
+    if len(regions) != len(entries):
+        return restore_regions(view, edit, entries)
+    
+    for region, entry in reversed(list(zip(regions, entries))):
+        if view.substr(region) == entry['replacement']:
+            view.replace(edit, region, entry['original'])
+    return True
+
+class ScanJob:
+    command = None
+    action = "Scanning for sensitive text"
+    
+    def __init__(self, view, patterns):
+        self.view = view
+        self.view_id = view.id()
+        self.patterns = patterns
+        self.size = view.size()
+        self.change_count = view.change_count()
+        self.pos = 0
+        self.cancelled = False
+        self.last_progress = 0
+        self.done = False
+        self.replacements = []
+    
+    def text(self, start, end):
+        return self.view.substr(sublime.Region(start, end))
+    
+    def read(self, size):
+        if self.cancelled:
+            raise ScanCancelled()
+        chunk = self.text(self.pos, min(self.pos + size, self.size))
+        self.pos += len(chunk)
+        self.report_progress()
+        return chunk
+    
+    def report_progress(self):
+        now = time.time()
+        if now - self.last_progress < PROGRESS_INTERVAL:
+            return
+        self.last_progress = now
+        percent = self.pos * 100 // max(self.size, 1)
+        self.view.set_status(STATUS_KEY, f"{self.action}... {percent}%")
+    
+    def record(self, start, end, original, rule):
+        self.replacements.append({
+            'start': start,
+            'end': end,
+            'original': original,
+            'replacement': rule['replacement']
+        })
+    
+    def run(self):
+        try:
+            for start, end, original, rule in redact_stream(self, DiscardOutput(), self.patterns, SCAN_CHUNK_SIZE):
+                self.record(start, end, original, rule)
+        except ScanCancelled:
+            self.finish(f"{self.action} cancelled")
+            return
+        except Exception as e:
+            self.finish(f"{self.action} failed: {e}")
+            return
+        
+        self.done = True
+        sublime.set_timeout(lambda: self.view.run_command(self.command), 0)
+    
+    def finish(self, message=None):
+        if scan_jobs.get(self.view_id) is self:
+            del scan_jobs[self.view_id]
+        self.view.erase_status(STATUS_KEY)
+        if message:
+            sublime.status_message(message)
+
+class HideJob(ScanJob):
+    command = 'apply_sensitive_text_redaction'
+    action = "Hiding sensitive text"
+    
+    def __init__(self, view, patterns):
+        super().__init__(view, patterns)
+        self.file_name = view.file_name()
+        self.content = view.substr(sublime.Region(0, self.size))
+    
+    def text(self, start, end):
+        return self.content[start:end]
+
+class MaskJob(ScanJob):
+    action = "Masking sensitive text"
+    
+    def __init__(self, view, patterns, state):
+        super().__init__(view, patterns)
+        self.state = state
+    
+    def run(self):
+        if self.cancelled:
+            self.view.erase_regions(PENDING_KEY)
+            self.finish(f"{self.action} cancelled")
+            return
+        
+        if mask_states.get(self.view_id) is not self.state:
+            self.finish()
+            return
+        
+        pending = self.view.get_regions(PENDING_KEY)
+        if not pending:
+            self.done = True
+            count = len(masked_spans(self.view))
+            self.finish(f"Masked {count} sensitive text occurrences" if count else "No sensitive text found to mask")
+            return
+        
+        index = nearest_region(pending, self.view.visible_region())
+        batch = pending[index]
+        change_count = self.view.change_count()
+        found = scan_batch(self.view, self.state, batch)
+        
+        if self.view.change_count() == change_count:
+            removed, added, conflicts = merge_found(masked_spans(self.view), found)
+            update_spans(self.view, self.state, removed, added)
+            self.view.add_regions(PENDING_KEY, pending[:index] + pending[index + 1:], '', '', sublime.HIDDEN)
+            if conflicts:
+                add_dirty(self.view, self.state, conflicts)
+                schedule_rescan(self.view, self.state)
+            self.pos += batch.size()
+            self.report_progress()
+        
+        sublime.set_timeout_async(self.run, 0)
+
+def mask_label(replacement):
+    return f'<span style="color: var(--redish)">{html.escape(replacement, quote=False)}</span>'
+
+class RuleSet:
+    def __init__(self, patterns):
+        self.patterns = patterns
+        self.prefilter = get_prefilter(patterns)
+        self.margin = rescan_margin(patterns)
+    
+    def find_spans(self, content, pos=0, endpos=None):
+        return self.prefilter.find_spans(content, pos, endpos)
+
+def merge_patterns(patterns, overrides):
+    merged = list(patterns)
+    positions = {pattern['name']: index for index, pattern in enumerate(merged) if pattern.get('name')}
+    for override in overrides:
+        index = positions.get(override.get('name'))
+        if index is None:
+            if override.get('name'):
+                positions[override['name']] = len(merged)
+            merged.append(override)
+        else:
+            merged[index] = override
+    return [pattern for pattern in merged if pattern.get('pattern')]
+
+def syntax_scope(view):
+    syntax = view.syntax() if hasattr(view, 'syntax') else None
+    if syntax:
+        return syntax.scope
+    return view.scope_name(0).strip()
+
+def load_rules(view=None):
+    global rules
+    current = rules
+    if current is None:
+        current = rules = RuleSet(load_patterns())
+    if view is None:
+        return current
+    
+    patterns = current.patterns
+    overrides = view.settings().get('sensitive_text_patterns')
+    if overrides:
+        patterns = merge_patterns(patterns, overrides)
+    patterns = select_patterns(patterns, view.file_name(), syntax_scope(view))
+    if patterns == current.patterns:
+        return current
+    
+    return rule_sets.get(ruleset_hash(patterns), lambda: RuleSet(patterns))
+
+def compile_rules():
+    global rules
+    rules = RuleSet(load_patterns())
+
+def on_settings_changed():
+    global rules
+    if rules is not None and load_patterns() == rules.patterns:
+        return
+    rules = None
+    rule_sets.clear()
+    sublime.set_timeout_async(compile_rules, 0)
+
+def span_state(key, rule_set, display):
+    return {
+        'key': key,
+        'dirty': f"{key}.dirty",
+        'display': display,
+        'active': True,
+        'labels': set(),
+        'phantoms': {},
+        'rules': rule_set,
+        'generation': 0,
+        'change_count': None
+    }
+
+def view_states(view):
+    view_id = view.id()
+    return [state for state in (mask_states.get(view_id), save_states.get(view_id)) if state is not None]
+
+def span_key(state, label):
+    return f"{state['key']}:{label}"
+
+def tracked_spans(view, state):
+    spans = []
+    for label in state['labels']:
+        spans.extend((region.a, region.b, label) for region in view.get_regions(span_key(state, label)))
+    spans.sort()
+    return spans
+
+def masked_spans(view):
+    state = mask_states.get(view.id())
+    if state is None:
+        return []
+    return tracked_spans(view, state)
+
+def update_spans(view, state, removed, added):
+    display = state['display']
+    if removed and display:
+        view.unfold([sublime.Region(start, end) for start, end, label in removed])
+    
+    changed = {label for start, end, label in removed} | {label for start, end, label in added}
+    for label in changed:
+        key = span_key(state, label)
+        gone = {(start, end) for start, end, span_label in removed if span_label == label}
+        spans = [(region.a, region.b) for region in view.get_regions(key) if (region.a, region.b) not in gone]
+        spans.extend((start, end) for start, end, span_label in added if span_label == label)
+        spans.sort()
+        
+        if not spans:
+            view.erase_regions(key)
+            state['labels'].discard(label)
+            phantoms = state['phantoms'].pop(label, None)
+            if phantoms is not None:
+                phantoms.update([])
+            continue
+        
+        regions = [sublime.Region(start, end) for start, end in spans]
+        state['labels'].add(label)
+        if not display:
+            view.add_regions(key, regions, '', '', sublime.HIDDEN)
+            continue
+        
+        view.add_regions(key, regions, 'region.redish', '', sublime.DRAW_NO_OUTLINE)
+        if label not in state['phantoms']:
+            state['phantoms'][label] = sublime.PhantomSet(view, key)
+        state['phantoms'][label].update([
+            sublime.Phantom(sublime.Region(start, start), mask_label(label), sublime.LAYOUT_INLINE)
+            for start, end in spans
+        ])
+    
+    if added and display:
+        view.fold([sublime.Region(start, end) for start, end, label in added])
+
+def clear_spans(view, states):
+    state = states.pop(view.id(), None)
+    if state is None:
+        return 0
+    spans = tracked_spans(view, state)
+    if spans and state['display']:
+        view.unfold([sublime.Region(start, end) for start, end, label in spans])
+    for label in state['labels']:
+        view.erase_regions(span_key(state, label))
+    for phantoms in state['phantoms'].values():
+        phantoms.update([])
+    view.erase_regions(state['dirty'])
+    state['active'] = False
+    return len(spans)
+
+def clear_mask(view):
+    count = clear_spans(view, mask_states)
+    view.erase_regions(PENDING_KEY)
+    return count
+
+def rescan_margin(patterns):
+    crossing = [p for p in patterns if not is_line_local(p.get('pattern'), p.get('flags', 0))]
+    if not crossing:
+        return 0, 0
+    return stream_window(crossing)
+
+def rescan_windows(view, dirty, spans, margin):
+    windows = []
+    for region in sorted(dirty, key=lambda region: region.begin()):
+        start = max(region.begin() - margin, 0)
+        end = min(region.end() + margin, view.size())
+        line = view.full_line(sublime.Region(start, end))
+        windows.append([line.begin(), line.end()])
+    
+    for start, end, label in spans:
+        for window in windows:
+            if start < window[1] and end > window[0]:
+                window[0] = min(window[0], start)
+                window[1] = max(window[1], end)
+    
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def scan_window(view, state, start, end, limit=None):
+    lead = min(start, state['rules'].margin[1])
+    shift = start - lead
+    text = view.substr(sublime.Region(shift, end))
+    limit = end if limit is None else limit
+    spans = []
+    for match_start, match_end, rule in state['rules'].find_spans(text, lead):
+        if match_start + shift >= limit:
+            break
+        spans.append((match_start + shift, match_end + shift, rule['replacement']))
+    return spans
+
+def scan_batch(view, state, batch):
+    end = batch.end()
+    overlap = state['rules'].margin[0]
+    if overlap and end < view.size():
+        point = min(end + overlap, view.size())
+        end = view.full_line(sublime.Region(point, point)).end()
+    return scan_window(view, state, batch.begin(), end, batch.end())
+
+def merge_found(spans, found):
+    starts = [span[0] for span in spans]
+    removed = []
+    added = []
+    conflicts = []
+    for span in found:
+        index = bisect.bisect_left(starts, span[1])
+        overlapping = []
+        while index and spans[index - 1][1] > span[0]:
+            index -= 1
+            overlapping.append(spans[index])
+        if not overlapping:
+            added.append(span)
+            continue
+        if span in overlapping:
+            continue
+        conflicts.append(sublime.Region(min([span[0]] + [other[0] for other in overlapping]), max([span[1]] + [other[1] for other in overlapping])))
+        if all(other[0] > span[0] for other in overlapping):
+            removed.extend(overlapping)
+            added.append(span)
+    return removed, added, conflicts
+
+def add_dirty(view, state, regions):
+    view.add_regions(state['dirty'], view.get_regions(state['dirty']) + regions, '', '', sublime.HIDDEN)
+
+def schedule_rescan(view, state):
+    state['generation'] += 1
+    generation = state['generation']
+    sublime.set_timeout_async(lambda: rescan_spans(view, state, generation), MASK_RESCAN_DELAY)
+
+def changed_regions(changes):
+    regions = []
+    for change in changes:
+        start = change.a.pt
+        delta = len(change.str) - (change.b.pt - start)
+        regions = [
+            (region_start + delta, region_end + delta) if region_start >= change.b.pt else
+            (min(region_start, start), max(region_end + delta, start + len(change.str))) if region_end >= start else
+            (region_start, region_end)
+            for region_start, region_end in regions
+        ]
+        regions.append((start, start + len(change.str)))
+    return [sublime.Region(start, end) for start, end in regions]
+
+def mask_batches(view):
+    size = view.size()
+    visible = view.full_line(view.visible_region())
+    bounds = {0, size, visible.begin(), visible.end()}
+    for pos in range(MASK_BATCH_SIZE, size, MASK_BATCH_SIZE):
+        if not visible.begin() < pos < visible.end():
+            bounds.add(view.full_line(sublime.Region(pos, pos)).end())
+    bounds = sorted(bounds)
+    return [sublime.Region(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+def nearest_region(regions, visible):
+    def distance(region):
+        if region.end() < visible.begin():
+            return visible.begin() - region.end()
+        if region.begin() > visible.end():
+            return region.begin() - visible.end()
+        return 0
+    return min(range(len(regions)), key=lambda index: distance(regions[index]))
+
+def rescan_dirty(view, state):
+    dirty = view.get_regions(state['dirty'])
+    change_count = view.change_count()
+    if not dirty:
+        state['change_count'] = change_count
+        return True
+    
+    view.erase_regions(state['dirty'])
+    spans = tracked_spans(view, state)
+    windows = rescan_windows(view, dirty, spans, state['rules'].margin[0])
+    
+    found = []
+    for start, end in windows:
+        found.extend(scan_window(view, state, start, end))
+    
+    if view.change_count() != change_count:
+        add_dirty(view, state, [sublime.Region(start, end) for start, end in windows])
+        return False
+    
+    stale = [span for span in spans if any(span[0] < end and span[1] > start for start, end in windows)]
+    found_set = set(found)
+    stale_set = set(stale)
+    update_spans(
+        view,
+        state,
+        [span for span in stale if span not in found_set],
+        [span for span in found if span not in stale_set]
+    )
+    state['change_count'] = change_count
+    return True
+
+def rescan_spans(view, state, generation):
+    if state['active'] and state['generation'] == generation:
+        rescan_dirty(view, state)
+
+def load_patterns():
+    settings = sublime.load_settings(SETTINGS_FILE)
+    patterns = settings.get('patterns', [])
+    
+    if not patterns:
+        patterns = [
+            {'pattern': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 'replacement': '${EMAIL}'},
+            {'pattern': r'\b(?:\d{4}[-\s]?){3}\d{4}\b', 'replacement': '${CREDIT_CARD}'},
+            {'pattern': r'\b\d{3}-\d{2}-\d{4}\b', 'replacement': '${SSN}'},
+            {'pattern': r'\b(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b', 'replacement': '${IP_ADDRESS}'},
+            {'pattern': r'\bapi[_-]?key[_-]?[a-zA-Z0-9]{20,}\b', 'replacement': '${API_KEY}', 'flags': re.IGNORECASE},
+        ]
+    return patterns
 
 def plugin_loaded():
-    settings = sublime.load_settings('SensitiveTextHider.sublime-settings')
+    settings = sublime.load_settings(SETTINGS_FILE)
     if not settings.has('patterns'):
         default_patterns = [
             {
@@ -38,7 +688,15 @@ def plugin_loaded():
             }
         ]
         settings.set('patterns', default_patterns)
-        sublime.save_settings('SensitiveTextHider.sublime-settings')
+        sublime.save_settings(SETTINGS_FILE)
+    
+    settings.add_on_change(STATUS_KEY, on_settings_changed)
+    sublime.set_timeout_async(compile_rules, 0)
+
+def plugin_unloaded():
+    sublime.load_settings(SETTINGS_FILE).clear_on_change(STATUS_KEY)
+    for view_id in list(sensitive_mappings):
+        forget_mapping(view_id)
 
 class HideSensitiveTextCommand(sublime_plugin.WindowCommand):
     def run(self):
@@ -50,75 +708,104 @@ class HideSensitiveTextCommand(sublime_plugin.WindowCommand):
 class HideSensitiveTextImplCommand(sublime_plugin.TextCommand):
     def run(self, edit):
         view_id = self.view.id()
-        file_name = self.view.file_name()
-        
-        settings = sublime.load_settings('SensitiveTextHider.sublime-settings')
-        patterns = settings.get('patterns', [])
         
-        if not patterns:
-            patterns = [
-                {'pattern': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 'replacement': '${EMAIL}'},
-                {'pattern': r'\b(?:\d{4}[-\s]?){3}\d{4}\b', 'replacement': '${CREDIT_CARD}'},
-                {'pattern': r'\b\d{3}-\d{2}-\d{4}\b', 'replacement': '${SSN}'},
-                {'pattern': r'\b(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b', 'replacement': '${IP_ADDRESS}'},
-                {'pattern': r'\bapi[_-]?key[_-]?[a-zA-Z0-9]{20,}\b', 'replacement': '${API_KEY}', 'flags': re.IGNORECASE},
-            ]
+        if view_id in scan_jobs:
+            sublime.status_message("Already hiding sensitive text in this view")
+            return
         
-        content = self.view.substr(sublime.Region(0, self.view.size()))
-        original_content = content
+        job = HideJob(self.view, load_rules(self.view).patterns)
+        scan_jobs[view_id] = job
+        self.view.set_status(STATUS_KEY, "Hiding sensitive text... 0%")
+        sublime.set_timeout_async(job.run, 0)
+
+class ApplySensitiveTextRedactionCommand(sublime_plugin.TextCommand):
+    def run(self, edit):
+        view_id = self.view.id()
+        job = scan_jobs.get(view_id)
+        if job is None or not job.done:
+            return
         
-        if file_name:
-            backup_file = file_name + '.sensitive_backup'
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                f.write(original_content)
-        else:
-            if view_id not in sensitive_mappings:
-                sensitive_mappings[view_id] = {}
-            sensitive_mappings[view_id]['original'] = original_content
+        if job.cancelled:
+            job.finish("Hiding sensitive text cancelled")
+            return
         
-        replacements = []
+        if self.view.change_count() != job.change_count:
+            job.finish("Buffer changed while scanning; sensitive text was not hidden")
+            return
         
-        for pattern_config in patterns:
-            pattern = pattern_config.get('pattern')
-            replacement = pattern_config.get('replacement', '${HIDDEN}')
-            flags = pattern_config.get('flags', 0)
-            
-            if isinstance(flags, str):
-                flags_value = 0
-                if 'IGNORECASE' in flags or 'I' in flags:
-                    flags_value |= re.IGNORECASE
-                if 'MULTILINE' in flags or 'M' in flags:
-                    flags_value |= re.MULTILINE
-                flags = flags_value
-            
-            matches = list(re.finditer(pattern, content, flags))
+        if job.replacements:
+            if job.file_name:
+                try:
+                    recorded = record_hidden(job.file_name, job.content, job.replacements)
+                except OSError:
+                    recorded = False
+                if not recorded:
+                    job.finish("Sensitive text was not hidden; the backup could not be updated")
+                    return
             
-            for match in reversed(matches):
-                original_text = match.group(0)
-                replacements.append({
-                    'start': match.start(),
-                    'end': match.end(),
-                    'original': original_text,
-                    'replacement': replacement
-                })
-                
-                content = content[:match.start()] + replacement + content[match.end():]
-        
-        if replacements:
-            if file_name:
-                mapping_file = file_name + '.sensitive_map'
-                with open(mapping_file, 'w', encoding='utf-8') as f:
-                    json.dump(replacements, f, indent=2)
-            else:
-                if view_id not in sensitive_mappings:
-                    sensitive_mappings[view_id] = {}
-                sensitive_mappings[view_id]['replacements'] = replacements
+            for entry in reversed(job.replacements):
+                self.view.replace(edit, sublime.Region(entry['start'], entry['end']), entry['replacement'])
             
-            self.view.replace(edit, sublime.Region(0, self.view.size()), content)
+            if not job.file_name:
+                forget_mapping(view_id)
+                regions = [sublime.Region(start, end) for start, end, entry in redacted_regions(job.replacements)]
+                self.view.add_regions(HIDDEN_KEY, regions, '', '', sublime.HIDDEN)
+                sensitive_mappings[view_id] = {'spans': HiddenSpans(job.replacements)}
+                enforce_memory_limit()
             
-            sublime.status_message(f"Hidden {len(replacements)} sensitive text occurrences")
+            job.finish(f"Hidden {len(job.replacements)} sensitive text occurrences")
         else:
-            sublime.status_message("No sensitive text found to hide")
+            job.finish("No sensitive text found to hide")
+
+class HideSensitiveTextOnSaveCommand(sublime_plugin.TextCommand):
+    def run(self, edit):
+        state = save_states.get(self.view.id())
+        if state is None:
+            return
+        
+        spans = tracked_spans(self.view, state)
+        if not spans:
+            return
+        
+        content = self.view.substr(sublime.Region(0, self.view.size()))
+        entries = [
+            {'start': start, 'end': end, 'original': content[start:end], 'replacement': label}
+            for start, end, label in spans
+        ]
+        
+        file_name = self.view.file_name()
+        if file_name:
+            try:
+                recorded = record_hidden(file_name, content, entries)
+            except OSError:
+                recorded = False
+            if not recorded:
+                sublime.status_message("Sensitive text was not hidden on save; the backup could not be updated")
+                return
+        
+        update_spans(self.view, state, spans, [])
+        for entry in reversed(entries):
+            self.view.replace(edit, sublime.Region(entry['start'], entry['end']), entry['replacement'])
+        state['change_count'] = self.view.change_count()
+        sublime.status_message(f"Hidden {len(entries)} sensitive text occurrences on save")
+
+class CancelSensitiveTextScanCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        view = self.window.active_view()
+        if not view:
+            return
+        
+        job = scan_jobs.get(view.id())
+        if job is None:
+            sublime.status_message("No sensitive text scan is running")
+            return
+        
+        job.cancelled = True
+        sublime.status_message("Cancelling sensitive text scan...")
+    
+    def is_enabled(self):
+        view = self.window.active_view()
+        return bool(view) and view.id() in scan_jobs
 
 class RevealSensitiveTextCommand(sublime_plugin.WindowCommand):
     def run(self):
@@ -138,25 +825,39 @@ class RevealSensitiveTextImplCommand(sublime_plugin.TextCommand):
             backup_file = file_name + '.sensitive_backup'
             mapping_file = file_name + '.sensitive_map'
             
-            if os.path.exists(backup_file):
-                with open(backup_file, 'r', encoding='utf-8') as f:
-                    original_content = f.read()
+            if os.path.exists(backup_file) or os.path.exists(mapping_file):
+                replacements = None
+                try:
+                    replacements = load_mapping(mapping_file)
+                except (OSError, ValueError):
+                    pass
                 
-                self.view.replace(edit, sublime.Region(0, self.view.size()), original_content)
+                if replacements and restore_regions(self.view, edit, replacements):
+                    restored = True
+                elif os.path.exists(backup_file):
+                    with open(backup_file, 'r', encoding='utf-8') as f:
+                        original_content = f.read()
+                    
+                    self.view.replace(edit, sublime.Region(0, self.view.size()), original_content)
+                    restored = True
+                else:
+                    sublime.status_message("Placeholders were edited and there is no backup. Cannot reveal sensitive text.")
+                    return
                 
                 try:
                     os.remove(backup_file)
-                    if os.path.exists(mapping_file):
-                        os.remove(mapping_file)
-                except:
+                except OSError:
+                    pass
+                try:
+                    os.remove(mapping_file)
+                except OSError:
                     pass
-                
-                restored = True
         else:
-            if view_id in sensitive_mappings and 'original' in sensitive_mappings[view_id]:
-                original_content = sensitive_mappings[view_id]['original']
-                self.view.replace(edit, sublime.Region(0, self.view.size()), original_content)
-                del sensitive_mappings[view_id]
+            mapping = sensitive_mappings.get(view_id)
+            if mapping and 'spans' in mapping:
+                restore_tracked(self.view, edit, self.view.get_regions(HIDDEN_KEY), mapping['spans'])
+                self.view.erase_regions(HIDDEN_KEY)
+                forget_mapping(view_id)
                 restored = True
         
         if restored:
@@ -178,16 +879,69 @@ class ToggleSensitiveTextImplCommand(sublime_plugin.TextCommand):
         
         has_backup = False
         if file_name:
-            backup_file = file_name + '.sensitive_backup'
-            has_backup = os.path.exists(backup_file)
+            has_backup = any(os.path.exists(file_name + ext) for ext in ('.sensitive_backup', '.sensitive_map'))
         else:
-            has_backup = view_id in sensitive_mappings and 'original' in sensitive_mappings[view_id]
+            has_backup = view_id in sensitive_mappings
         
         if has_backup:
             self.view.run_command('reveal_sensitive_text_impl')
         else:
             self.view.run_command('hide_sensitive_text_impl')
 
+class MaskSensitiveTextCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        view = self.window.active_view()
+        if not view:
+            return
+        view.run_command('mask_sensitive_text_impl')
+
+class MaskSensitiveTextImplCommand(sublime_plugin.TextCommand):
+    def run(self, edit):
+        view_id = self.view.id()
+        
+        if view_id in scan_jobs:
+            sublime.status_message("A sensitive text scan is already running in this view")
+            return
+        
+        clear_mask(self.view)
+        rule_set = load_rules(self.view)
+        state = span_state(MASK_KEY, rule_set, True)
+        mask_states[view_id] = state
+        self.view.add_regions(PENDING_KEY, mask_batches(self.view), '', '', sublime.HIDDEN)
+        
+        job = MaskJob(self.view, rule_set.patterns, state)
+        scan_jobs[view_id] = job
+        self.view.set_status(STATUS_KEY, "Masking sensitive text... 0%")
+        sublime.set_timeout_async(job.run, 0)
+
+class UnmaskSensitiveTextCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        view = self.window.active_view()
+        if not view:
+            return
+        view.run_command('unmask_sensitive_text_impl')
+
+class UnmaskSensitiveTextImplCommand(sublime_plugin.TextCommand):
+    def run(self, edit):
+        if clear_mask(self.view):
+            sublime.status_message("Sensitive text unmasked")
+        else:
+            sublime.status_message("No masked sensitive text in this view")
+
+class ToggleSensitiveMaskCommand(sublime_plugin.WindowCommand):
+    def run(self):
+        view = self.window.active_view()
+        if not view:
+            return
+        view.run_command('toggle_sensitive_mask_impl')
+
+class ToggleSensitiveMaskImplCommand(sublime_plugin.TextCommand):
+    def run(self, edit):
+        if self.view.id() in mask_states:
+            self.view.run_command('unmask_sensitive_text_impl')
+        else:
+            self.view.run_command('mask_sensitive_text_impl')
+
 class AddSensitivePatternCommand(sublime_plugin.WindowCommand):
     def run(self):
         self.window.show_input_panel(
@@ -210,7 +964,7 @@ class AddSensitivePatternCommand(sublime_plugin.WindowCommand):
             )
     
     def on_replacement_entered(self, replacement):
-        settings = sublime.load_settings('SensitiveTextHider.sublime-settings')
+        settings = sublime.load_settings(SETTINGS_FILE)
         patterns = settings.get('patterns', [])
         
         patterns.append({
@@ -220,11 +974,50 @@ class AddSensitivePatternCommand(sublime_plugin.WindowCommand):
         })
         
         settings.set('patterns', patterns)
-        sublime.save_settings('SensitiveTextHider.sublime-settings')
+        sublime.save_settings(SETTINGS_FILE)
         sublime.status_message(f"Added pattern: {self.pattern} -> {replacement}")
 
 class SensitiveTextEventListener(sublime_plugin.EventListener):
     def on_close(self, view):
         view_id = view.id()
-        if view_id in sensitive_mappings:
-            del sensitive_mappings[view_id]
\ No newline at end of file
+        job = scan_jobs.pop(view_id, None)
+        if job is not None:
+            job.cancelled = True
+        mask_states.pop(view_id, None)
+        save_states.pop(view_id, None)
+        forget_mapping(view_id)
+    
+    def on_modified_async(self, view):
+        for state in view_states(view):
+            schedule_rescan(view, state)
+    
+    def on_pre_save(self, view):
+        settings = sublime.load_settings(SETTINGS_FILE)
+        if not settings.get('auto_hide_on_save', False):
+            return
+        
+        state = save_states.get(view.id())
+        if state is None:
+            state = span_state(FINDINGS_KEY, load_rules(view), False)
+            found = scan_window(view, state, 0, view.size())
+            update_spans(view, state, [], found)
+            state['change_count'] = view.change_count()
+            save_states[view.id()] = state
+        elif state['change_count'] != view.change_count():
+            rescan_dirty(view, state)
+        
+        if state['labels']:
+            view.run_command('hide_sensitive_text_on_save')
+
+class SensitiveTextChangeListener(sublime_plugin.TextChangeListener):
+    @classmethod
+    def is_applicable(cls, buffer):
+        return True
+    
+    def on_text_changed(self, changes):
+        for view in self.buffer.views():
+            states = view_states(view)
+            if states:
+                regions = changed_regions(changes)
+                for state in states:
+                    add_dirty(view, state, regions)
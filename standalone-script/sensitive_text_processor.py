@@ -5,6 +5,27 @@ import json
 import sys
 import os
 import argparse
+import hashlib
+import shutil
+import glob
+import fnmatch
+import io
+import time
+import contextlib
+import mmap
+import threading
+import tempfile
+import bisect
+import heapq
+import select
+import struct
+import types
+from collections import OrderedDict
+
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
 
 DEFAULT_PATTERNS = [
     {'pattern': r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}', 'replacement': '${EMAIL}'},
@@ -15,66 +36,1414 @@ DEFAULT_PATTERNS = [
     {'pattern': r'\bpassword\s*[:=]\s*[\'\"]?([^\'\"\s]+)[\'\"]?', 'replacement': '${PASSWORD}', 'flags': re.IGNORECASE},
 ]
 
-def hide_sensitive_text(file_path, patterns=None):
+PATTERN_CACHE_SIZE = 128
+LOCAL_SCAN_SPACING = 512
+LOCAL_SCAN_MAX_LINE = 65536
+SUBSET_SCAN_MIN = 64 * 1024
+LITERAL_SCAN_HITS = 64
+STREAM_CHUNK_SIZE = 1024 * 1024
+LINE_COUNT_CHUNK = 64 * 1024
+STREAM_THRESHOLD = 64 * 1024 * 1024
+STREAM_MAX_OVERLAP = 64 * 1024
+PARALLEL_WORKERS = os.cpu_count() or 1
+WATCH_DEBOUNCE = 1.0
+WATCH_POLL_INTERVAL = 1.0
+FOLLOW_POLL_INTERVAL = 0.5
+FOLLOW_SAVE_INTERVAL = 1.0
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+SENSITIVE_SUFFIXES = ('.sensitive_backup', '.sensitive_map', '.sensitive_tmp', '.sensitive_map.tmp', '.sensitive_offset', '.sensitive_offset.tmp', '.sensitive_backup.tmp')
+MMAP_UNSAFE_BYTES = re.compile(rb'[\r\x1c-\x1f\x80-\xff]')
+MAP_VERSION = 2
+MANIFEST_VERSION = 1
+MAP_INDEX_STRIDE = 256
+MAP_INDEX_KEYS = ('start', 'redacted_start', 'line', 'redacted_line')
+
+INLINE_FLAGS = [
+    (re.IGNORECASE, 'i'),
+    (re.MULTILINE, 'm'),
+    (re.DOTALL, 's'),
+    (re.ASCII, 'a'),
+]
+
+NEWLINE_CATEGORIES = (
+    sre_parse.CATEGORY_NOT_DIGIT,
+    sre_parse.CATEGORY_SPACE,
+    sre_parse.CATEGORY_NOT_WORD,
+    sre_parse.CATEGORY_LINEBREAK,
+)
+
+def parse_flags(flags):
+    if not isinstance(flags, str):
+        return flags or 0
+    
+    value = 0
+    for part in flags.split('|'):
+        part = part.strip()
+        if part in ['IGNORECASE', 'I']:
+            value |= re.IGNORECASE
+        if part in ['MULTILINE', 'M']:
+            value |= re.MULTILINE
+        if part in ['DOTALL', 'S']:
+            value |= re.DOTALL
+    return value
+
+def _rule_key(p):
+    return [p.get('pattern'), parse_flags(p.get('flags', 0)), p.get('replacement', '${HIDDEN}'), p.get('requires'), p.get('priority')]
+
+def ruleset_hash(patterns):
+    rules = [_rule_key(p) for p in patterns]
+    return hashlib.sha1(json.dumps(rules).encode('utf-8')).hexdigest()
+
+def rule_fingerprints(patterns):
+    return [hashlib.sha1(json.dumps(_rule_key(p)).encode('utf-8')).hexdigest()[:16] for p in patterns]
+
+def _as_list(value):
+    return [value] if isinstance(value, str) else list(value or ())
+
+def _matches_files(globs, path):
+    name = os.path.basename(path)
+    normalized = path.replace(os.sep, '/')
+    return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(normalized, pattern) for pattern in globs)
+
+def _matches_scopes(selectors, scope):
+    names = scope.split()
+    return any(name == selector or name.startswith(selector + '.') for selector in selectors for name in names)
+
+def pattern_applies(pattern_config, path=None, scope=None):
+    files = _as_list(pattern_config.get('files'))
+    scopes = _as_list(pattern_config.get('scopes'))
+    if not files and not scopes:
+        return True
+    if files and path and _matches_files(files, path):
+        return True
+    if scopes and scope and _matches_scopes(scopes, scope):
+        return True
+    return False
+
+def select_patterns(patterns, path=None, scope=None):
+    return [p for p in patterns if pattern_applies(p, path, scope)]
+
+class PatternCache:
+    def __init__(self, maxsize=PATTERN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key, factory):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        
+        value = factory()
+        
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def info(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+                'maxsize': self.maxsize
+            }
+
+pattern_cache = PatternCache()
+
+def compile_pattern(pattern, flags=0):
+    flags = parse_flags(flags)
+    if isinstance(pattern, bytes):
+        flags &= ~re.UNICODE
+    return pattern_cache.get((pattern, flags, None), lambda: re.compile(pattern, flags))
+
+def get_scanner(patterns, binary=False):
+    kind = 'bytes scanner' if binary else 'scanner'
+    return pattern_cache.get((None, kind, ruleset_hash(patterns)), lambda: PatternScanner(patterns, binary))
+
+def get_prefilter(patterns, binary=False):
+    kind = 'bytes prefilter' if binary else 'prefilter'
+    return pattern_cache.get((None, kind, ruleset_hash(patterns)), lambda: LiteralPrefilter(patterns, binary))
+
+def _source(pattern, binary):
+    return pattern.encode('ascii') if binary else pattern
+
+def _has_group_reference(items):
+    for item in items:
+        if isinstance(item, sre_parse.SubPattern):
+            if _has_group_reference(item.data):
+                return True
+        elif isinstance(item, (tuple, list)):
+            if item and item[0] in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+                return True
+            if _has_group_reference(item):
+                return True
+    return False
+
+def _inline_flags(flags):
+    letters = ''
+    for flag, letter in INLINE_FLAGS:
+        if flags & flag:
+            letters += letter
+            flags &= ~flag
+    if flags & ~re.UNICODE:
+        return None
+    return letters
+
+def _is_combinable(pattern, flags):
+    if _inline_flags(flags) is None:
+        return False
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return False
+    if parsed.state.flags & ~re.UNICODE != flags & ~re.UNICODE:
+        return False
+    if parsed.state.groupdict or parsed.getwidth()[0] == 0:
+        return False
+    return not _has_group_reference(parsed.data)
+
+class PatternScanner:
+    def __init__(self, patterns, binary=False):
+        self.binary = binary
+        self.rules = []
+        self.group_rules = {}
+        self.sources = []
+        
+        alternatives = []
+        group_flags = None
+        group_parts = []
+        
+        for index, pattern_config in enumerate(patterns):
+            rule = {
+                'pattern': pattern_config.get('pattern'),
+                'replacement': pattern_config.get('replacement', '${HIDDEN}'),
+                'flags': parse_flags(pattern_config.get('flags', 0))
+            }
+            self.rules.append(rule)
+            
+            if not _is_combinable(rule['pattern'], rule['flags']):
+                self.sources.append((compile_pattern(_source(rule['pattern'], binary), rule['flags']), index))
+                continue
+            
+            if rule['flags'] != group_flags and group_parts:
+                alternatives.append(self._flag_group(group_flags, group_parts))
+                group_parts = []
+            group_flags = rule['flags']
+            
+            name = f'r{index}'
+            self.group_rules[name] = index
+            group_parts.append(f'(?:{rule["pattern"]})(?P<{name}>)')
+        
+        if group_parts:
+            alternatives.append(self._flag_group(group_flags, group_parts))
+        
+        if alternatives:
+            self.sources.insert(0, (re.compile(_source('|'.join(alternatives), binary)), None))
+    
+    def _flag_group(self, flags, parts):
+        letters = _inline_flags(flags)
+        if letters:
+            return f'(?{letters}:{"|".join(parts)})'
+        return '|'.join(parts)
+    
+    def search_sources(self, orders=None):
+        if orders is None:
+            orders = list(range(len(self.rules)))
+        
+        sources = []
+        for regex, rule_index in self.sources:
+            if rule_index is None:
+                resolve = lambda match: orders[self.group_rules[match.lastgroup]]
+            else:
+                resolve = lambda match, order=orders[rule_index]: order
+            sources.append((regex.search, resolve))
+        return sources
+    
+    def scan(self, content, pos=0, endpos=None):
+        for start, end, index in scan_sources(content, self.search_sources(), pos, endpos):
+            yield start, end, self.rules[index]
+
+def scan_sources(content, sources, pos=0, endpos=None):
+    if endpos is None:
+        endpos = len(content)
+    
+    pending = [None] * len(sources)
+    
+    while pos <= endpos:
+        best = None
+        
+        for source_index, (search, resolve) in enumerate(sources):
+            match = pending[source_index]
+            if match is False:
+                continue
+            if match is None or match.start() < pos:
+                match = search(content, pos, endpos)
+                pending[source_index] = match or False
+                if not match:
+                    continue
+            
+            candidate = (match.start(), resolve(match), match.end())
+            if best is None or candidate < best:
+                best = candidate
+        
+        if best is None:
+            break
+        
+        start, order, end = best
+        yield start, end, order
+        pos = end if end > start else start + 1
+
+def _candidates(content, search, resolve, pos, endpos):
+    while pos <= endpos:
+        match = search(content, pos, endpos)
+        if not match:
+            return
+        start, end = match.span()
+        yield start, end, resolve(match)
+        pos = end if end > start else start + 1
+
+def _resolve_cluster(cluster, priorities):
+    starts = []
+    accepted = []
+    for start, end, index in sorted(cluster, key=lambda span: (-priorities[span[2]], span[0] - span[1], span[0], span[2])):
+        position = bisect.bisect_right(starts, start)
+        if position and accepted[position - 1][1] > start:
+            continue
+        if position < len(starts) and starts[position] < end:
+            continue
+        starts.insert(position, start)
+        accepted.insert(position, (start, end, index))
+    return accepted
+
+def resolve_sources(content, sources, priorities, pos=0, endpos=None):
+    if endpos is None:
+        endpos = len(content)
+    
+    cluster = []
+    cluster_end = -1
+    for span in heapq.merge(*(_candidates(content, search, resolve, pos, endpos) for search, resolve in sources)):
+        if cluster and span[0] >= cluster_end:
+            yield from _resolve_cluster(cluster, priorities)
+            cluster = []
+        cluster.append(span)
+        cluster_end = max(cluster_end, span[1])
+    
+    yield from _resolve_cluster(cluster, priorities)
+
+def _class_has_newline(items):
+    negate = False
+    found = False
+    for op, av in items:
+        if op is sre_parse.NEGATE:
+            negate = True
+        elif op is sre_parse.LITERAL:
+            found = found or av == 10
+        elif op is sre_parse.RANGE:
+            found = found or av[0] <= 10 <= av[1]
+        elif op is sre_parse.CATEGORY:
+            found = found or av in NEWLINE_CATEGORIES
+        else:
+            return True
+    return found != negate
+
+def _crosses_lines(items, flags):
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            if av == 10:
+                return True
+        elif op is sre_parse.NOT_LITERAL:
+            if av != 10:
+                return True
+        elif op is sre_parse.ANY:
+            if flags & re.DOTALL:
+                return True
+        elif op is sre_parse.IN:
+            if _class_has_newline(av):
+                return True
+        elif op is sre_parse.AT:
+            if av is sre_parse.AT_END_STRING or (av is sre_parse.AT_END and not flags & re.MULTILINE):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _crosses_lines(av[1].data, flags):
+                return True
+        elif op is sre_parse.SUBPATTERN:
+            group, add_flags, del_flags, sub = av
+            if _crosses_lines(sub.data, (flags | add_flags) & ~del_flags):
+                return True
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            if _crosses_lines(av[2].data, flags):
+                return True
+        elif op is sre_parse.BRANCH:
+            if any(_crosses_lines(branch.data, flags) for branch in av[1]):
+                return True
+        elif op is not sre_parse.GROUPREF:
+            return True
+    return False
+
+def is_line_local(pattern, flags=0):
+    try:
+        parsed = sre_parse.parse(pattern, parse_flags(flags))
+    except (re.error, TypeError):
+        return False
+    if parsed.getwidth()[0] == 0:
+        return False
+    return not _crosses_lines(parsed.data, parsed.state.flags)
+
+def _line_search(regex, find_literal, newline='\n'):
+    def search(content, pos, endpos):
+        while pos <= endpos:
+            literal = find_literal(content, pos, endpos)
+            if not literal:
+                return None
+            
+            line_start = content.rfind(newline, 0, literal.start()) + 1
+            line_end = content.find(newline, literal.end(), endpos)
+            if line_end == -1:
+                line_end = endpos
+            if line_end - line_start > LOCAL_SCAN_MAX_LINE:
+                return regex.search(content, pos, endpos)
+            
+            match = regex.search(content, max(pos, line_start), line_end)
+            if match:
+                return match
+            pos = line_end + 1
+        return None
+    return search
+
+def _literal_runs(items, ignorecase):
+    runs = []
+    current = []
+    
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        if op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            continue
+        
+        if current:
+            runs.append((''.join(current), ignorecase))
+            current = []
+        
+        if op is sre_parse.SUBPATTERN:
+            group, add_flags, del_flags, sub = av
+            sub_ignorecase = bool((ignorecase or add_flags & re.IGNORECASE) and not del_flags & re.IGNORECASE)
+            runs.extend(_literal_runs(sub.data, sub_ignorecase))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            runs.extend(_literal_runs(av[2].data, ignorecase))
+    
+    if current:
+        runs.append((''.join(current), ignorecase))
+    return runs
+
+def required_literals(pattern, flags=0, requires=None):
+    flags = parse_flags(flags)
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, TypeError):
+        parsed = None
+    
+    ignorecase = bool((parsed.state.flags if parsed else flags) & re.IGNORECASE)
+    
+    if requires is not None:
+        if isinstance(requires, str):
+            requires = [requires]
+        return [(literal, ignorecase) for literal in requires if literal] or None
+    
+    if parsed is None:
+        return None
+    
+    runs = _literal_runs(parsed.data, ignorecase)
+    if not runs:
+        return None
+    return [max(runs, key=lambda run: len(run[0]))]
+
+def _literals_overlap(first, second):
+    a, b = first[0], second[0]
+    if first[1] or second[1]:
+        a, b = a.lower(), b.lower()
+    if a in b or b in a:
+        return True
+    return any(a.endswith(b[:size]) or b.endswith(a[:size]) for size in range(1, min(len(a), len(b))))
+
+class LiteralPrefilter:
+    def __init__(self, patterns, binary=False):
+        self.binary = binary
+        self.patterns = list(patterns)
+        self.rules = []
+        self.literals = []
+        self.requirements = []
+        self.local = {}
+        self.key = ruleset_hash(self.patterns)
+        self.priorities = [pattern_config.get('priority', 0) for pattern_config in self.patterns]
+        self.prioritized = any('priority' in pattern_config for pattern_config in self.patterns)
+        
+        for index, pattern_config in enumerate(self.patterns):
+            rule = {
+                'pattern': pattern_config.get('pattern'),
+                'replacement': pattern_config.get('replacement', '${HIDDEN}'),
+                'flags': parse_flags(pattern_config.get('flags', 0))
+            }
+            self.rules.append(rule)
+            
+            literals = required_literals(rule['pattern'], rule['flags'], pattern_config.get('requires'))
+            if literals is None:
+                self.requirements.append(None)
+                continue
+            
+            indices = set()
+            for literal in literals:
+                if literal not in self.literals:
+                    self.literals.append(literal)
+                indices.add(self.literals.index(literal))
+            self.requirements.append(indices)
+            
+            if pattern_config.get('requires') is None and is_line_local(rule['pattern'], rule['flags']):
+                literal_index = self.literals.index(literals[0])
+                self.local[index] = literal_index
+        
+        parts = []
+        self.literal_regexes = []
+        for index, (literal, ignorecase) in enumerate(self.literals):
+            text = f'(?i:{re.escape(literal)})' if ignorecase else re.escape(literal)
+            parts.append(f'{text}()')
+            self.literal_regexes.append(re.compile(_source(text, self.binary)))
+        self.literal_regex = re.compile(_source('|'.join(parts), self.binary)) if parts else None
+        self.overlaps = [
+            {other for other in range(len(self.literals)) if other != index and _literals_overlap(self.literals[index], self.literals[other])}
+            for index in range(len(self.literals))
+        ]
+        self.overlapping = any(self.overlaps)
+        
+        self.required = [index for index, pattern_config in enumerate(self.patterns) if pattern_config.get('requires') is not None]
+        self.unrequired = [index for index, pattern_config in enumerate(self.patterns) if pattern_config.get('requires') is None]
+        self.base_scanner = PatternScanner([self.patterns[index] for index in self.unrequired], binary)
+    
+    def find_literals(self, content, pos=0, endpos=None):
+        if endpos is None:
+            endpos = len(content)
+        
+        found = set()
+        repeats = 0
+        for match in self.literal_regex.finditer(content, pos, endpos):
+            index = match.lastindex - 1
+            if index not in found:
+                found.add(index)
+                if len(found) == len(self.literals):
+                    return found
+                continue
+            
+            repeats += 1
+            if repeats > LITERAL_SCAN_HITS:
+                found.update(
+                    index for index, regex in enumerate(self.literal_regexes)
+                    if index not in found and regex.search(content, match.start(), endpos)
+                )
+                break
+        
+        if self.overlapping:
+            shadowed = set().union(*(self.overlaps[index] for index in found)) - found
+            found.update(index for index in shadowed if self.literal_regexes[index].search(content, pos, endpos))
+        return found
+    
+    def _is_sparse(self, literal_index, content, pos, endpos):
+        limit = (endpos - pos) // LOCAL_SCAN_SPACING
+        literal, ignorecase = self.literals[literal_index]
+        if not ignorecase and isinstance(content, str):
+            return content.count(literal, pos, endpos) <= limit
+        
+        count = 0
+        for match in self.literal_regexes[literal_index].finditer(content, pos, endpos):
+            count += 1
+            if count > limit:
+                return False
+        return True
+    
+    def plan(self, content, pos=0, endpos=None):
+        if endpos is None:
+            endpos = len(content)
+        
+        found = self.find_literals(content, pos, endpos) if self.literals else set()
+        active = [
+            index
+            for index, requirement in enumerate(self.requirements)
+            if requirement is None or requirement & found
+        ]
+        
+        sparse = {}
+        local = set()
+        for index in active:
+            literal_index = self.local.get(index)
+            if literal_index is None:
+                continue
+            if literal_index not in sparse:
+                sparse[literal_index] = self._is_sparse(literal_index, content, pos, endpos)
+            if sparse[literal_index]:
+                local.add(index)
+        
+        return active, local
+    
+    def scanner(self, orders):
+        kind = 'bytes subset scanner' if self.binary else 'subset scanner'
+        return pattern_cache.get((self.key, kind, tuple(orders)),
+                                 lambda: PatternScanner([self.patterns[index] for index in orders], self.binary))
+    
+    def base_sources(self, active):
+        sources = self.base_scanner.search_sources(self.unrequired)
+        sources.extend(self.rule_source(index) for index in self.required if index in active)
+        return sources
+    
+    def rule_source(self, index):
+        rule = self.rules[index]
+        regex = compile_pattern(_source(rule['pattern'], self.binary), rule['flags'])
+        return regex.search, lambda match: index
+    
+    def line_source(self, index):
+        rule = self.rules[index]
+        regex = compile_pattern(_source(rule['pattern'], self.binary), rule['flags'])
+        literal_regex = self.literal_regexes[self.local[index]]
+        newline = b'\n' if self.binary else '\n'
+        return _line_search(regex, literal_regex.search, newline), lambda match: index
+    
+    def find_spans(self, content, pos=0, endpos=None):
+        return (
+            (start, end, self.rules[index])
+            for start, end, index in _scan_with_prefilter(self, content, pos, endpos)
+        )
+
+def _scan_with_prefilter(prefilter, content, pos, endpos):
+    active, local = prefilter.plan(content, pos, endpos)
+    if not active:
+        return iter(())
+    
+    if not prefilter.prioritized and (len(content) if endpos is None else endpos) - pos < SUBSET_SCAN_MIN:
+        return scan_sources(content, prefilter.base_sources(set(active)), pos, endpos)
+    
+    orders = [index for index in active if index not in local]
+    if prefilter.prioritized:
+        sources = [prefilter.rule_source(index) for index in orders]
+    else:
+        sources = prefilter.scanner(orders).search_sources(orders)
+    sources.extend(prefilter.line_source(index) for index in sorted(local))
+    
+    if prefilter.prioritized:
+        return resolve_sources(content, sources, prefilter.priorities, pos, endpos)
+    return scan_sources(content, sources, pos, endpos)
+
+def find_rule_spans(content, patterns, pos=0, endpos=None):
+    prefilter = get_prefilter(patterns, not isinstance(content, str))
+    return _scan_with_prefilter(prefilter, content, pos, endpos)
+
+def find_spans(content, patterns, pos=0, endpos=None):
+    return get_prefilter(patterns, not isinstance(content, str)).find_spans(content, pos, endpos)
+
+def _assert_widths(items):
+    ahead = 0
+    behind = 0
+    for op, av in items:
+        if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            direction, sub = av
+            width = sub.getwidth()[1]
+            if direction == 1:
+                ahead = max(ahead, width)
+            else:
+                behind = max(behind, width)
+            children = [sub]
+        elif op is sre_parse.SUBPATTERN:
+            children = [av[3]]
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            children = [av[2]]
+        elif op is sre_parse.BRANCH:
+            children = av[1]
+        else:
+            children = []
+        
+        for child in children:
+            child_ahead, child_behind = _assert_widths(child.data)
+            ahead = max(ahead, child_ahead)
+            behind = max(behind, child_behind)
+    return ahead, behind
+
+def stream_window(patterns):
+    overlap = 0
+    context = 0
+    for pattern_config in patterns:
+        flags = parse_flags(pattern_config.get('flags', 0))
+        try:
+            parsed = sre_parse.parse(pattern_config.get('pattern'), flags)
+        except (re.error, TypeError):
+            return STREAM_MAX_OVERLAP + 1, STREAM_MAX_OVERLAP + 1
+        ahead, behind = _assert_widths(parsed.data)
+        overlap = max(overlap, parsed.getwidth()[1] + ahead)
+        context = max(context, behind)
+    if any('priority' in pattern_config for pattern_config in patterns):
+        overlap *= 2
+    return min(overlap, STREAM_MAX_OVERLAP) + 1, min(context, STREAM_MAX_OVERLAP) + 1
+
+def redact_stream(source, output, patterns, chunk_size=STREAM_CHUNK_SIZE, flush=False):
+    overlap, context = stream_window(patterns)
+    buffer = ''
+    offset = 0
+    pos = 0
+    eof = False
+    
+    while not eof:
+        chunk = source.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        
+        limit = len(buffer) if eof else len(buffer) - overlap
+        if limit < pos:
+            continue
+        
+        written = pos
+        for start, end, rule in find_spans(buffer, patterns, pos):
+            if start > limit:
+                break
+            output.write(buffer[written:start])
+            output.write(rule['replacement'])
+            yield offset + start, offset + end, buffer[start:end], rule
+            written = end
+            pos = end if end > start else start + 1
+        
+        pos = max(pos, limit + 1)
+        output.write(buffer[written:pos])
+        if flush:
+            output.flush()
+        
+        keep = max(0, pos - context)
+        buffer = buffer[keep:]
+        offset += keep
+        pos -= keep
+
+def redact_lines(lines, output, patterns, flush=True):
+    prefilter = get_prefilter(patterns)
+    context_size = stream_window(patterns)[1]
+    context = ''
+    offset = 0
+    
+    for line in lines:
+        text = context + line
+        base = offset - len(context)
+        written = len(context)
+        
+        for start, end, index in _scan_with_prefilter(prefilter, text, len(context), None):
+            rule = prefilter.rules[index]
+            output.write(text[written:start])
+            output.write(rule['replacement'])
+            yield base + start, base + end, text[start:end], rule
+            written = end
+        
+        output.write(text[written:])
+        if flush:
+            output.flush()
+        
+        offset += len(line)
+        context = text[-context_size:]
+
+def filter_stream(source, output, patterns=None, chunk_size=None, mapping=None):
     if patterns is None:
         patterns = DEFAULT_PATTERNS
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    if mapping is None:
+        if chunk_size:
+            spans = redact_stream(source, output, patterns, chunk_size, flush=True)
+        else:
+            spans = redact_lines(iter(source.readline, ''), output, patterns)
+        return sum(1 for span in spans)
     
-    original_content = content
+    counter = LineCounter(output)
+    if chunk_size:
+        spans = redact_stream(source, counter, patterns, chunk_size, flush=True)
+    else:
+        spans = redact_lines(iter(source.readline, ''), counter, patterns)
     
-    if not content or content.isspace():
+    spans = ((start, end, original, rule['replacement']) for start, end, original, rule in spans)
+    return dump_mapping(stream_entries(spans, counter), mapping)
+
+class LineCounter:
+    __slots__ = ('output', 'lines', 'newline', 'digest')
+    
+    def __init__(self, output, newline='\n', digest=None):
+        self.output = output
+        self.lines = 0
+        self.newline = newline
+        self.digest = digest
+    
+    def write(self, text):
+        self.output.write(text)
+        if self.digest is not None:
+            self.digest.update(text.encode('utf-8') if isinstance(text, str) else text)
+        if isinstance(text, memoryview):
+            for pos in range(0, len(text), LINE_COUNT_CHUNK):
+                self.lines += text[pos:pos + LINE_COUNT_CHUNK].tobytes().count(self.newline)
+        else:
+            self.lines += text.count(self.newline)
+    
+    def flush(self):
+        self.output.flush()
+
+def _mapping_entry(start, end, shift, line, line_shift, original, replacement):
+    return {
+        'start': start,
+        'end': end,
+        'redacted_start': start + shift,
+        'redacted_end': start + shift + len(replacement),
+        'line': line,
+        'redacted_line': line - line_shift,
+        'original': original,
+        'replacement': replacement
+    }
+
+def stream_entries(spans, counter):
+    shift = 0
+    line_shift = 0
+    for start, end, original, replacement in spans:
+        line = counter.lines - replacement.count('\n') + line_shift + 1
+        yield _mapping_entry(start, end, shift, line, line_shift, original, replacement)
+        shift += len(replacement) - (end - start)
+        line_shift += original.count('\n') - replacement.count('\n')
+
+def locate_entries(content, entries):
+    located = []
+    shift = 0
+    line_shift = 0
+    line = 1
+    last = 0
+    for entry in entries:
+        start, end, original, replacement = entry['start'], entry['end'], entry['original'], entry['replacement']
+        line += content.count('\n', last, start)
+        last = start
+        located.append(_mapping_entry(start, end, shift, line, line_shift, original, replacement))
+        shift += len(replacement) - (end - start)
+        line_shift += original.count('\n') - replacement.count('\n')
+    return located
+
+def dump_mapping(entries, f):
+    f.write(json.dumps({'version': MAP_VERSION}) + '\n')
+    count = 0
+    for entry in entries:
+        f.write(json.dumps(entry) + '\n')
+        count += 1
+    return count
+
+def content_digest(content):
+    return hashlib.sha256(content.encode('utf-8'))
+
+def write_mapping(entries, f, rules=None, digest=None, stride=MAP_INDEX_STRIDE):
+    index = []
+    count = 0
+    offset = 0
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as body:
+        for entry in entries:
+            line = json.dumps(entry) + '\n'
+            if count % stride == 0:
+                index.append([entry[key] for key in MAP_INDEX_KEYS] + [offset])
+            body.write(line)
+            offset += len(line)
+            count += 1
+        
+        header = {'version': MAP_VERSION, 'count': count, 'stride': stride, 'keys': list(MAP_INDEX_KEYS), 'index': index}
+        if rules is not None:
+            header['rules'] = rules
+        if digest is not None:
+            header['hash'] = digest.hexdigest()
+        f.write(json.dumps(header, separators=(',', ':')) + '\n')
+        body.seek(0)
+        shutil.copyfileobj(body, f)
+    return count
+
+def _read_entries(f):
+    first = f.readline()
+    if first.lstrip().startswith('['):
+        yield from json.loads(first + f.read())
         return
+    if first.strip() and json.loads(first).get('version', MAP_VERSION) > MAP_VERSION:
+        raise ValueError("Mapping was written by a newer version")
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+def read_mapping(f):
+    return list(_read_entries(f))
+
+def iter_mapping(mapping_file):
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        yield from _read_entries(f)
+
+def load_mapping_header(mapping_file):
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        first = f.readline()
+    if first.lstrip().startswith('[') or not first.strip():
+        return {}
+    return json.loads(first)
+
+def load_mapping(mapping_file):
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        return read_mapping(f)
+
+class MappingIndex:
+    def __init__(self, mapping_file):
+        self.mapping_file = mapping_file
+        with open(mapping_file, 'rb') as f:
+            first = f.readline()
+        if first.lstrip().startswith(b'['):
+            raise ValueError(f"{mapping_file} uses the old mapping format; hide the file again to index it")
+        
+        header = json.loads(first)
+        self.count = header.get('count')
+        self.stride = header.get('stride', 1)
+        self.index = header.get('index') or []
+        self.columns = {key: [row[column] for row in self.index] for column, key in enumerate(MAP_INDEX_KEYS)}
+        self.body = len(first)
+        self.crlf = first.endswith(b'\r\n')
+    
+    def entries_from(self, key, value):
+        offset = 0
+        if self.index:
+            block = max(bisect.bisect_left(self.columns[key], value) - 1, 0)
+            offset = self.index[block][-1] + (block * self.stride if self.crlf else 0)
+        
+        with open(self.mapping_file, 'rb') as f:
+            f.seek(self.body + offset)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    def at(self, position, redacted=True):
+        key, end_key = ('redacted_start', 'redacted_end') if redacted else ('start', 'end')
+        for entry in self.entries_from(key, position):
+            if entry[key] > position:
+                break
+            if entry[end_key] > position:
+                return entry
+        return None
     
+    def at_line(self, line, redacted=True):
+        key = 'redacted_line' if redacted else 'line'
+        found = []
+        for entry in self.entries_from(key, line):
+            if entry[key] > line:
+                break
+            if entry[key] == line:
+                found.append(entry)
+        return found
+
+def apply_spans(content, spans):
+    parts = []
+    last = 0
+    for start, end, replacement in spans:
+        parts.append(content[last:start])
+        parts.append(replacement)
+        last = end
+    parts.append(content[last:])
+    return ''.join(parts)
+
+def redact_text(content, patterns):
+    spans = []
     replacements = []
     
-    for pattern_config in patterns:
-        pattern = pattern_config.get('pattern')
-        replacement = pattern_config.get('replacement', '${HIDDEN}')
-        flags = pattern_config.get('flags', 0)
+    for start, end, rule in find_spans(content, patterns):
+        spans.append((start, end, rule['replacement']))
+        replacements.append({
+            'start': start,
+            'end': end,
+            'original': content[start:end],
+            'replacement': rule['replacement']
+        })
+    
+    return apply_spans(content, spans), locate_entries(content, replacements)
+
+def _next_pos(span):
+    start, end = span[0], span[1]
+    return end if end > start else start + 1
+
+def shard_bounds(view, shards):
+    size = len(view)
+    step = max(size // shards, 1)
+    bounds = []
+    start = 0
+    
+    while start < size:
+        end = view.find(b'\n', start + step - 1)
+        end = size if end == -1 else end + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+def _scan_shard(file_path, patterns, start, end, endpos):
+    with open(file_path, 'rb') as source:
+        view = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            spans = []
+            for span in find_rule_spans(view, patterns, start, endpos):
+                if span[0] >= end:
+                    break
+                spans.append(span)
+            return spans
+        finally:
+            view.close()
+
+def merge_shard_spans(view, patterns, bounds, shard_spans, overlap):
+    pos = 0
+    for (start, end), spans in zip(bounds, shard_spans):
+        pos = max(pos, start)
+        index = 0
+        while index < len(spans) and spans[index][0] < pos:
+            index += 1
         
-        matches = list(re.finditer(pattern, content, flags))
+        resumed = start if index == 0 else _next_pos(spans[index - 1])
+        if resumed > pos:
+            known = {span: offset for offset, span in enumerate(spans)}
+            index = len(spans)
+            endpos = min(len(view), end + overlap)
+            for span in find_rule_spans(view, patterns, pos, endpos):
+                if span[0] >= end:
+                    break
+                if span in known:
+                    index = known[span]
+                    break
+                yield span
+                pos = _next_pos(span)
         
-        for match in reversed(matches):
-            original_text = match.group(0)
-            replacements.append({
-                'start': match.start(),
-                'end': match.end(),
-                'original': original_text,
-                'replacement': replacement
-            })
-            
-            content = content[:match.start()] + replacement + content[match.end():]
+        for span in spans[index:]:
+            yield span
+            pos = _next_pos(span)
+
+def find_spans_parallel(file_path, view, patterns, workers=None):
+    from concurrent.futures import ProcessPoolExecutor
+    
+    workers = workers or PARALLEL_WORKERS
+    bounds = shard_bounds(view, workers * 4)
+    overlap = stream_window(patterns)[0]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_scan_shard, file_path, patterns, start, end, min(len(view), end + overlap))
+            for start, end in bounds
+        ]
+        shard_spans = [future.result() for future in futures]
+    
+    return merge_shard_spans(view, patterns, bounds, shard_spans, overlap)
+
+def hide_sensitive_text(file_path, patterns=None, chunk_size=None, workers=None, backup=True):
+    if patterns is None:
+        patterns = DEFAULT_PATTERNS
+    patterns = select_patterns(patterns, file_path)
+    
+    if os.path.exists(file_path + '.sensitive_map'):
+        count = hide_new_patterns(file_path, patterns, backup, chunk_size or STREAM_CHUNK_SIZE)
+        if count is not None:
+            return count
+    
+    if chunk_size is None:
+        large = os.path.getsize(file_path) > STREAM_THRESHOLD
+        if large or workers:
+            count = hide_sensitive_text_mmap(file_path, patterns, workers or PARALLEL_WORKERS, backup)
+            if count is not None:
+                return count
+            if large:
+                chunk_size = STREAM_CHUNK_SIZE
+    if chunk_size:
+        return hide_sensitive_text_streaming(file_path, patterns, chunk_size, backup)
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    original_content = content
+    
+    if not content or content.isspace():
+        return 0
+    
+    content, replacements = redact_text(content, patterns)
     
     if replacements:
         backup_file = file_path + '.sensitive_backup'
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            f.write(original_content)
+        if backup:
+            with open(backup_file, 'w', encoding='utf-8') as f:
+                f.write(original_content)
         
         mapping_file = file_path + '.sensitive_map'
         with open(mapping_file, 'w', encoding='utf-8') as f:
-            json.dump(replacements, f, indent=2)
+            write_mapping(replacements, f, rule_fingerprints(patterns), content_digest(content))
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
         print(f"Hidden {len(replacements)} sensitive text occurrences")
-        print(f"Backup saved to: {backup_file}")
+        if backup:
+            print(f"Backup saved to: {backup_file}")
         print(f"Mapping saved to: {mapping_file}")
     else:
         print("No sensitive text found to hide")
+    
+    return len(replacements)
+
+def redacted_spans(entries):
+    shift = 0
+    for entry in entries:
+        start = entry['start'] + shift
+        yield start, start + len(entry['replacement']), entry
+        shift += len(entry['replacement']) - (entry['end'] - entry['start'])
+
+def _placeholders_intact(source, placeholders, digest, chunk_size):
+    buffer = ''
+    base = 0
+    for start, end, entry in placeholders:
+        while base + len(buffer) < end:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk.encode('utf-8'))
+            keep = min(max(0, start - base), len(buffer))
+            buffer = buffer[keep:] + chunk
+            base += keep
+        if buffer[start - base:end - base] != entry['replacement']:
+            return False
+    for chunk in iter(lambda: source.read(chunk_size), ''):
+        digest.update(chunk.encode('utf-8'))
+    return True
+
+def _skip_placeholders(spans, placeholders):
+    current = next(placeholders, None)
+    for start, end, original, rule in spans:
+        while current is not None and current[1] <= start:
+            current = next(placeholders, None)
+        if current is not None and (current[0] <= start or current[0] < end):
+            continue
+        yield start, end, original, rule['replacement']
 
-def reveal_sensitive_text(file_path):
+def _merge_hidden(source, placeholders, found, output, original, digest, added, chunk_size):
+    events = heapq.merge(
+        ((start, end, entry['original'], entry['replacement'], False) for start, end, entry in placeholders),
+        ((start, end, text, replacement, True) for start, end, text, replacement in found)
+    )
+    buffer = ''
+    base = 0
+    cursor = 0
+    position = 0
+    shift = 0
+    lines = 0
+    line_shift = 0
+    
+    def copy(text):
+        output.write(text)
+        original.write(text)
+        digest.update(text.encode('utf-8'))
+    
+    for start, end, text, replacement, new in events:
+        while base + len(buffer) < end:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            buffer = buffer[cursor - base:] + chunk
+            base = cursor
+        
+        unchanged = buffer[cursor - base:start - base]
+        copy(unchanged)
+        position += len(unchanged)
+        lines += unchanged.count('\n')
+        
+        entry = _mapping_entry(position, position + len(text), shift, lines + 1, line_shift, text, replacement)
+        original.write(text)
+        output.write(replacement)
+        digest.update(replacement.encode('utf-8'))
+        position += len(text)
+        shift += len(replacement) - len(text)
+        lines += text.count('\n')
+        line_shift += text.count('\n') - replacement.count('\n')
+        cursor = end
+        if new:
+            added[0] += 1
+        yield entry
+    
+    copy(buffer[cursor - base:])
+    for chunk in iter(lambda: source.read(chunk_size), ''):
+        copy(chunk)
+
+def hide_new_patterns(file_path, patterns, backup=True, chunk_size=STREAM_CHUNK_SIZE):
     backup_file = file_path + '.sensitive_backup'
     mapping_file = file_path + '.sensitive_map'
+    output_file = file_path + '.sensitive_tmp'
+    mapping_tmp = mapping_file + '.tmp'
+    backup_tmp = backup_file + '.tmp'
     
-    if os.path.exists(backup_file):
-        with open(backup_file, 'r', encoding='utf-8') as f:
-            original_content = f.read()
+    try:
+        header = load_mapping_header(mapping_file)
+    except ValueError:
+        return None
+    applied = header.get('rules', [])
+    previous = header.get('hash')
+    del header
+    
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, 'r', encoding='utf-8') as source:
+            if not _placeholders_intact(source, redacted_spans(iter_mapping(mapping_file)), digest, chunk_size):
+                return None
+    except ValueError:
+        return None
+    
+    fingerprints = rule_fingerprints(patterns)
+    rules = applied + [fingerprint for fingerprint in fingerprints if fingerprint not in applied]
+    changed = previous != digest.hexdigest()
+    if not changed:
+        delta = [pattern_config for pattern_config, fingerprint in zip(patterns, fingerprints) if fingerprint not in applied]
+    else:
+        delta = patterns
+    if not delta:
+        print("All patterns were already applied to this file")
+        return 0
+    
+    write_backup = backup or os.path.exists(backup_file)
+    added = [0]
+    try:
+        with open(file_path, 'r', encoding='utf-8') as scan_source, \
+                open(file_path, 'r', encoding='utf-8') as source, \
+                open(output_file, 'w', encoding='utf-8') as output, \
+                open(backup_tmp if write_backup else os.devnull, 'w', encoding='utf-8') as original, \
+                open(mapping_tmp, 'w', encoding='utf-8') as mapping, \
+                open(os.devnull, 'w', encoding='utf-8') as discard:
+            spans = redact_stream(scan_source, discard, delta, chunk_size)
+            found = _skip_placeholders(spans, redacted_spans(iter_mapping(mapping_file)))
+            redacted_digest = hashlib.sha256()
+            entries = _merge_hidden(source, redacted_spans(iter_mapping(mapping_file)), found, output, original,
+                                    redacted_digest, added, chunk_size)
+            write_mapping(entries, mapping, rules, redacted_digest)
+    except BaseException as e:
+        for path in (output_file, mapping_tmp, backup_tmp):
+            if os.path.exists(path):
+                os.remove(path)
+        if isinstance(e, ValueError):
+            return None
+        raise
+    
+    os.replace(mapping_tmp, mapping_file)
+    if write_backup:
+        if added[0] or changed:
+            os.replace(backup_tmp, backup_file)
+        else:
+            os.remove(backup_tmp)
+    
+    if not added[0]:
+        os.remove(output_file)
+        print(f"No sensitive text found for {len(delta)} patterns")
+        return 0
+    
+    shutil.copymode(file_path, output_file)
+    os.replace(output_file, file_path)
+    
+    print(f"Hidden {added[0]} sensitive text occurrences with {len(delta)} patterns")
+    print(f"Mapping updated: {mapping_file}")
+    return added[0]
+
+def hide_sensitive_text_streaming(file_path, patterns=None, chunk_size=STREAM_CHUNK_SIZE, backup=True):
+    if patterns is None:
+        patterns = DEFAULT_PATTERNS
+    
+    if os.path.getsize(file_path) == 0:
+        return 0
+    
+    backup_file = file_path + '.sensitive_backup'
+    mapping_file = file_path + '.sensitive_map'
+    output_file = file_path + '.sensitive_tmp'
+    mapping_tmp = mapping_file + '.tmp'
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as source, \
+                open(output_file, 'w', encoding='utf-8') as output, \
+                open(mapping_tmp, 'w', encoding='utf-8') as mapping:
+            counter = LineCounter(output, digest=hashlib.sha256())
+            spans = (
+                (start, end, original, rule['replacement'])
+                for start, end, original, rule in redact_stream(source, counter, patterns, chunk_size)
+            )
+            count = write_mapping(stream_entries(spans, counter), mapping, rule_fingerprints(patterns), counter.digest)
+    except BaseException:
+        for path in (output_file, mapping_tmp):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    
+    if not count:
+        os.remove(output_file)
+        os.remove(mapping_tmp)
+        print("No sensitive text found to hide")
+        return 0
+    
+    os.replace(mapping_tmp, mapping_file)
+    if backup:
+        os.replace(file_path, backup_file)
+        shutil.copymode(backup_file, output_file)
+    else:
+        shutil.copymode(file_path, output_file)
+    os.replace(output_file, file_path)
+    
+    print(f"Hidden {count} sensitive text occurrences")
+    if backup:
+        print(f"Backup saved to: {backup_file}")
+    print(f"Mapping saved to: {mapping_file}")
+    return count
+
+def mmap_compatible(view, patterns):
+    try:
+        get_prefilter(patterns, True)
+        get_scanner(patterns, True)
+    except (UnicodeEncodeError, re.error, ValueError):
+        return False
+    return MMAP_UNSAFE_BYTES.search(view) is None
+
+def hide_sensitive_text_mmap(file_path, patterns=None, workers=1, backup=True):
+    if patterns is None:
+        patterns = DEFAULT_PATTERNS
+    
+    if os.path.getsize(file_path) == 0:
+        return None
+    
+    backup_file = file_path + '.sensitive_backup'
+    mapping_file = file_path + '.sensitive_map'
+    output_file = file_path + '.sensitive_tmp'
+    mapping_tmp = mapping_file + '.tmp'
+    
+    with open(file_path, 'rb') as source:
+        view = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if not mmap_compatible(view, patterns):
+                return None
+            if hasattr(view, 'madvise'):
+                view.madvise(mmap.MADV_SEQUENTIAL)
+            
+            rules = get_prefilter(patterns, True).rules
+            if workers and workers > 1:
+                spans = find_spans_parallel(file_path, view, patterns, workers)
+            else:
+                spans = find_rule_spans(view, patterns)
+            
+            with memoryview(view) as data, \
+                    open(output_file, 'wb') as output, \
+                    open(mapping_tmp, 'w', encoding='utf-8') as mapping:
+                counter = LineCounter(output, b'\n', hashlib.sha256())
+                
+                def written():
+                    last = 0
+                    for start, end, index in spans:
+                        rule = rules[index]
+                        counter.write(data[last:start])
+                        counter.write(rule['replacement'].encode('utf-8'))
+                        last = end
+                        yield start, end, view[start:end].decode('ascii'), rule['replacement']
+                    counter.write(data[last:])
+                
+                count = write_mapping(stream_entries(written(), counter), mapping, rule_fingerprints(patterns), counter.digest)
+        except BaseException:
+            for path in (output_file, mapping_tmp):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        finally:
+            view.close()
+    
+    if not count:
+        os.remove(output_file)
+        os.remove(mapping_tmp)
+        print("No sensitive text found to hide")
+        return 0
+    
+    os.replace(mapping_tmp, mapping_file)
+    if backup:
+        os.replace(file_path, backup_file)
+        shutil.copymode(backup_file, output_file)
+    else:
+        shutil.copymode(file_path, output_file)
+    os.replace(output_file, file_path)
+    
+    print(f"Hidden {count} sensitive text occurrences")
+    if backup:
+        print(f"Backup saved to: {backup_file}")
+    print(f"Mapping saved to: {mapping_file}")
+    return count
+
+def patch_stream(source, output, entries, chunk_size=STREAM_CHUNK_SIZE):
+    buffer = ''
+    base = 0
+    cursor = 0
+    shift = 0
+    count = 0
+    
+    for entry in entries:
+        replacement = entry['replacement']
+        start = entry['start'] + shift
+        end = start + len(replacement)
+        shift += len(replacement) - (entry['end'] - entry['start'])
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(original_content)
+        while base + len(buffer) < end:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                raise ValueError(f"Mapping entry at {start} is past the end of the file")
+            split = min(start - base, len(buffer))
+            output.write(buffer[cursor:split])
+            buffer = buffer[split:] + chunk
+            base += split
+            cursor = 0
+        
+        index = start - base
+        if buffer[index:index + len(replacement)] != replacement:
+            raise ValueError(f"Expected {replacement} at {start}; the file changed since it was hidden")
+        output.write(buffer[cursor:index])
+        output.write(entry['original'])
+        cursor = index + len(replacement)
+        count += 1
+    
+    output.write(buffer[cursor:])
+    shutil.copyfileobj(source, output, chunk_size)
+    return count
+
+def reveal_from_mapping(file_path, mapping_file, chunk_size=STREAM_CHUNK_SIZE):
+    output_file = file_path + '.sensitive_tmp'
+    
+    entries = load_mapping(mapping_file)
+    
+    try:
+        with open(file_path, 'r', encoding='utf-8') as source, \
+                open(output_file, 'w', encoding='utf-8') as output:
+            count = patch_stream(source, output, entries, chunk_size)
+    except BaseException:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        raise
+    
+    shutil.copymode(file_path, output_file)
+    os.replace(output_file, file_path)
+    return count
+
+def reveal_sensitive_text(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    backup_file = file_path + '.sensitive_backup'
+    mapping_file = file_path + '.sensitive_map'
+    
+    if os.path.exists(backup_file):
+        with open(backup_file, 'r', encoding='utf-8') as source, \
+                open(file_path, 'w', encoding='utf-8') as target:
+            shutil.copyfileobj(source, target, STREAM_CHUNK_SIZE)
         
         try:
             os.remove(backup_file)
@@ -84,8 +1453,20 @@ def reveal_sensitive_text(file_path):
             pass
         
         print("Sensitive text revealed")
+        return True
+    elif os.path.exists(mapping_file):
+        try:
+            reveal_from_mapping(file_path, mapping_file, chunk_size)
+        except ValueError as e:
+            print(f"Cannot reveal sensitive text: {e}")
+            return False
+        
+        os.remove(mapping_file)
+        print("Sensitive text revealed")
+        return True
     else:
         print("No backup file found. Cannot reveal sensitive text.")
+        return False
 
 def load_custom_patterns(patterns_file):
     with open(patterns_file, 'r', encoding='utf-8') as f:
@@ -93,52 +1474,676 @@ def load_custom_patterns(patterns_file):
     
     patterns = []
     for p in patterns_data:
-        flags = 0
-        if 'flags' in p:
-            if isinstance(p['flags'], str):
-                flag_parts = p['flags'].split('|')
-                for part in flag_parts:
-                    part = part.strip()
-                    if part in ['IGNORECASE', 'I']:
-                        flags |= re.IGNORECASE
-                    if part in ['MULTILINE', 'M']:
-                        flags |= re.MULTILINE
-                    if part in ['DOTALL', 'S']:
-                        flags |= re.DOTALL
-            else:
-                flags = p['flags']
-        
-        patterns.append({
+        pattern_config = {
             'pattern': p['pattern'],
             'replacement': p.get('replacement', '${HIDDEN}'),
-            'flags': flags
-        })
+            'flags': parse_flags(p.get('flags', 0))
+        }
+        for key in ('requires', 'priority', 'files', 'scopes'):
+            if key in p:
+                pattern_config[key] = p[key]
+        patterns.append(pattern_config)
     
     return patterns
 
+def _is_artifact(path):
+    return path.endswith(SENSITIVE_SUFFIXES)
+
+def _walk_files(directory):
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+        for name in sorted(names):
+            yield os.path.join(root, name)
+
+def collect_files(paths, action='hide'):
+    files = []
+    missing = []
+    seen = set()
+    
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = list(_walk_files(path))
+        elif os.path.exists(path):
+            candidates = [path]
+        elif glob.has_magic(path) and glob.glob(path, recursive=True):
+            candidates = []
+            for match in sorted(glob.glob(path, recursive=True)):
+                candidates.extend(_walk_files(match) if os.path.isdir(match) else [match])
+        else:
+            missing.append(path)
+            continue
+        
+        for candidate in candidates:
+            if _is_artifact(candidate) or not os.path.isfile(candidate):
+                continue
+            if action == 'reveal' and not any(os.path.exists(candidate + ext) for ext in ('.sensitive_backup', '.sensitive_map')):
+                continue
+            key = os.path.abspath(candidate)
+            if key not in seen:
+                seen.add(key)
+                files.append(candidate)
+    
+    return files, missing
+
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(STREAM_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_record(file_path, rules, digest=None):
+    stat = os.stat(file_path)
+    return {
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'hash': digest or file_digest(file_path),
+        'rules': rules
+    }
+
+class Manifest:
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.files = data.get('files', {})
+    
+    def key(self, file_path):
+        return os.path.abspath(file_path)
+    
+    def get(self, file_path):
+        return self.files.get(self.key(file_path))
+    
+    def is_current(self, file_path, rules):
+        record = self.get(file_path)
+        if record is None or record['rules'] != rules:
+            return False
+        stat = os.stat(file_path)
+        return record['size'] == stat.st_size and record['mtime'] == stat.st_mtime_ns
+    
+    def update(self, file_path, record):
+        if record is None:
+            self.files.pop(self.key(file_path), None)
+        else:
+            self.files[self.key(file_path)] = record
+    
+    def save(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+_batch_patterns = None
+
+def _init_batch_worker(patterns):
+    global _batch_patterns, PARALLEL_WORKERS
+    _batch_patterns = patterns
+    PARALLEL_WORKERS = 1
+    if patterns is not None:
+        get_prefilter(patterns)
+        get_scanner(patterns)
+
+def _process_batch_file(action, file_path, patterns=None, backup=True, rules=None, previous=None):
+    if patterns is None:
+        patterns = _batch_patterns
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if action == 'hide':
+                if previous is not None and previous['rules'] == rules:
+                    digest = file_digest(file_path)
+                    if digest == previous['hash']:
+                        return file_path, 'current', 0, file_record(file_path, rules, digest)
+                count = hide_sensitive_text(file_path, patterns, backup=backup)
+                return file_path, 'done', count, file_record(file_path, rules) if rules else None
+            return file_path, 'done', int(reveal_sensitive_text(file_path)), None
+    except UnicodeDecodeError:
+        return file_path, 'skipped', 0, file_record(file_path, rules) if rules else None
+    except Exception as e:
+        return file_path, 'error', str(e), None
+
+def _batch_rules(patterns, file_path, hashes):
+    selected = select_patterns(patterns, file_path)
+    key = tuple(id(pattern_config) for pattern_config in selected)
+    if key not in hashes:
+        hashes[key] = ruleset_hash(selected)
+    return hashes[key]
+
+def run_batch(action, files, patterns=None, jobs=None, backup=True, manifest=None):
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if action == 'hide' and patterns is None:
+        patterns = DEFAULT_PATTERNS
+    
+    summary = {'files': len(files), 'changed': 0, 'occurrences': 0, 'skipped': 0, 'current': 0, 'errors': []}
+    started = time.time()
+    
+    rules = {}
+    previous = {}
+    if manifest is not None:
+        manifest = Manifest(manifest)
+        files = [file_path for file_path in files if manifest.key(file_path) != manifest.key(manifest.path)]
+        summary['files'] = len(files)
+        if action == 'hide':
+            hashes = {}
+            pending = []
+            for file_path in files:
+                rules[file_path] = _batch_rules(patterns, file_path, hashes)
+                if manifest.is_current(file_path, rules[file_path]):
+                    summary['current'] += 1
+                    continue
+                previous[file_path] = manifest.get(file_path)
+                pending.append(file_path)
+            files = pending
+    
+    jobs = max(1, min(jobs or PARALLEL_WORKERS, len(files) or 1))
+    files = sorted(files, key=os.path.getsize, reverse=True)
+    file_rules = [rules.get(file_path) for file_path in files]
+    file_previous = [previous.get(file_path) for file_path in files]
+    
+    if jobs == 1:
+        results = (
+            _process_batch_file(action, file_path, patterns, backup, file_rules[index], file_previous[index])
+            for index, file_path in enumerate(files)
+        )
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker, initargs=(patterns,))
+        results = executor.map(_process_batch_file, [action] * len(files), files, [None] * len(files),
+                               [backup] * len(files), file_rules, file_previous)
+    
+    try:
+        for file_path, status, result, record in results:
+            if manifest is not None and status != 'error':
+                manifest.update(file_path, record)
+            if status == 'current':
+                summary['current'] += 1
+            elif status == 'skipped':
+                summary['skipped'] += 1
+            elif status == 'error':
+                summary['errors'].append((file_path, result))
+                print(f"Error: {file_path}: {result}")
+            elif result:
+                summary['changed'] += 1
+                summary['occurrences'] += result
+                if action == 'hide':
+                    print(f"{file_path}: hidden {result} sensitive text occurrences")
+                else:
+                    print(f"{file_path}: revealed")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if manifest is not None:
+            manifest.save()
+    
+    summary['elapsed'] = time.time() - started
+    
+    if action == 'hide':
+        print(f"Processed {summary['files']} files in {summary['elapsed']:.2f}s: "
+              f"hidden {summary['occurrences']} occurrences in {summary['changed']} files")
+    else:
+        print(f"Processed {summary['files']} files in {summary['elapsed']:.2f}s: "
+              f"revealed {summary['changed']} files")
+    if summary['current']:
+        print(f"{summary['current']} files up to date")
+    if summary['skipped']:
+        print(f"Skipped {summary['skipped']} non-text files")
+    if summary['errors']:
+        print(f"{len(summary['errors'])} files failed")
+    
+    return summary
+
+def _text_stream(stream, mode):
+    if not hasattr(stream, 'buffer'):
+        return stream
+    if mode == 'r':
+        return io.TextIOWrapper(stream.buffer, encoding='utf-8', errors='surrogateescape', newline='')
+    return io.TextIOWrapper(stream.buffer, encoding='utf-8', errors='surrogateescape', newline='', write_through=True)
+
+def load_follow_state(state_file):
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {'inode': None, 'offset': 0}
+    return {'inode': state.get('inode'), 'offset': state.get('offset', 0)}
+
+def save_follow_state(state_file, state):
+    temp_path = state_file + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'inode': state['inode'], 'offset': state['offset']}, f)
+    os.replace(temp_path, state_file)
+
+def follow_lines(file_path, state, checkpoint=None, poll_interval=FOLLOW_POLL_INTERVAL, stop=None):
+    f = None
+    pending = b''
+    
+    try:
+        while stop is None or not stop.is_set():
+            if f is None:
+                try:
+                    f = open(file_path, 'rb')
+                except FileNotFoundError:
+                    time.sleep(poll_interval)
+                    continue
+                stat = os.fstat(f.fileno())
+                if state['inode'] == stat.st_ino and state['offset'] <= stat.st_size:
+                    f.seek(state['offset'])
+                else:
+                    state['inode'] = stat.st_ino
+                    state['offset'] = 0
+                pending = b''
+            
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if chunk:
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line.decode('utf-8', 'surrogateescape') + '\n'
+                    state['offset'] += len(line) + 1
+                if checkpoint is not None:
+                    checkpoint()
+                continue
+            
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                stat = None
+            
+            if stat is not None and stat.st_ino != state['inode']:
+                lines = (pending + f.read()).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line.decode('utf-8', 'surrogateescape') + '\n'
+                if pending:
+                    yield pending.decode('utf-8', 'surrogateescape') + '\n'
+                f.close()
+                f = None
+                state['inode'] = None
+                state['offset'] = 0
+                continue
+            
+            if stat is not None and stat.st_size < state['offset'] + len(pending):
+                f.seek(0)
+                pending = b''
+                state['offset'] = 0
+                continue
+            
+            if checkpoint is not None:
+                checkpoint(True)
+            time.sleep(poll_interval)
+    finally:
+        if f is not None:
+            f.close()
+
+def follow_file(file_path, output, patterns=None, state_file=None, mapping=None, poll_interval=FOLLOW_POLL_INTERVAL, stop=None):
+    if patterns is None:
+        patterns = DEFAULT_PATTERNS
+    if state_file is None:
+        state_file = file_path + '.sensitive_offset'
+    
+    state = load_follow_state(state_file)
+    saved = dict(state)
+    last_save = time.monotonic()
+    
+    def checkpoint(force=False):
+        nonlocal saved, last_save
+        if state == saved or not force and time.monotonic() - last_save < FOLLOW_SAVE_INTERVAL:
+            return
+        output.flush()
+        save_follow_state(state_file, state)
+        saved = dict(state)
+        last_save = time.monotonic()
+    
+    lines = follow_lines(file_path, state, checkpoint, poll_interval, stop)
+    source = types.SimpleNamespace(readline=lambda: next(lines, ''))
+    try:
+        return filter_stream(source, output, select_patterns(patterns, file_path), None, mapping)
+    except KeyboardInterrupt:
+        return None
+    finally:
+        lines.close()
+        checkpoint(True)
+
+def run_filter(paths, patterns=None, chunk_size=None, map_file=None, follow=False, state_file=None):
+    if follow and (len(paths) != 1 or paths[0] == '-'):
+        print("Error: --follow needs exactly one file", file=sys.stderr)
+        sys.exit(1)
+    
+    output = _text_stream(sys.stdout, 'w')
+    mapping = open(map_file, 'w', encoding='utf-8') if map_file else None
+    
+    try:
+        sources = paths or ['-']
+        if len(sources) > 1 and mapping is not None:
+            print("Error: --map can only be used with a single input", file=sys.stderr)
+            sys.exit(1)
+        
+        if follow:
+            follow_file(sources[0], output, DEFAULT_PATTERNS if patterns is None else patterns, state_file, mapping)
+            return
+        
+        for path in sources:
+            selected = select_patterns(DEFAULT_PATTERNS if patterns is None else patterns, None if path == '-' else path)
+            if path == '-':
+                filter_stream(_text_stream(sys.stdin, 'r'), output, selected, chunk_size, mapping)
+            else:
+                with open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='') as source:
+                    filter_stream(source, output, selected, chunk_size, mapping)
+    except BrokenPipeError:
+        sys.stderr.close()
+    finally:
+        if mapping is not None:
+            mapping.close()
+        output.flush()
+
+class PollingWatcher:
+    method = 'polling'
+    
+    def __init__(self, interval=WATCH_POLL_INTERVAL):
+        self.interval = interval
+        self.roots = []
+        self.snapshot = {}
+        self.last_scan = 0
+    
+    def _scan(self):
+        current = {}
+        stack = list(self.roots)
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith('.'):
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            current[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        self.last_scan = time.monotonic()
+        return current
+    
+    def add(self, directory):
+        self.roots.append(directory)
+        self.snapshot = self._scan()
+    
+    def read(self, timeout):
+        wait = self.last_scan + self.interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(wait, 0))
+        
+        current = self._scan()
+        changed = [path for path, state in current.items() if self.snapshot.get(path) != state]
+        self.snapshot = current
+        return changed
+    
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    method = 'inotify'
+    mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify is not available")
+        self.roots = []
+        self.directories = {}
+    
+    def _add_tree(self, directory):
+        files = []
+        for root, dirs, names in os.walk(directory):
+            dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), self.mask)
+            if wd >= 0:
+                self.directories[wd] = root
+            files.extend(os.path.join(root, name) for name in sorted(names))
+        return files
+    
+    def add(self, directory):
+        self.roots.append(directory)
+        self._add_tree(directory)
+    
+    def read(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = struct.unpack_from('iIII', data, offset)
+            name = os.fsdecode(data[offset + 16:offset + 16 + length].rstrip(b'\0'))
+            offset += 16 + length
+            
+            if mask & IN_Q_OVERFLOW:
+                for root in self.roots:
+                    changed.extend(_walk_files(root))
+                continue
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            
+            directory = self.directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if not name.startswith('.'):
+                    changed.extend(self._add_tree(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed.append(path)
+        return changed
+    
+    def close(self):
+        os.close(self.fd)
+
+def create_watcher(polling=False):
+    if not polling:
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher()
+
+def _watch_file(file_path, patterns, backup, seen, manifest=None, hashes=None):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return
+    if seen.get(file_path) == (stat.st_size, stat.st_mtime_ns):
+        return
+    
+    rules = previous = None
+    if manifest is not None:
+        rules = _batch_rules(patterns, file_path, hashes)
+        if manifest.is_current(file_path, rules):
+            seen[file_path] = (stat.st_size, stat.st_mtime_ns)
+            return
+        previous = manifest.get(file_path)
+    
+    file_path, status, result, record = _process_batch_file('hide', file_path, patterns, backup, rules, previous)
+    if status == 'error':
+        print(f"Error: {file_path}: {result}", flush=True)
+    elif status == 'done' and result:
+        print(f"{file_path}: hidden {result} sensitive text occurrences", flush=True)
+    
+    if manifest is not None and status != 'error':
+        manifest.update(file_path, record)
+        manifest.save()
+    
+    try:
+        stat = os.stat(file_path)
+        seen[file_path] = (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        pass
+
+def watch(paths, patterns=None, backup=True, debounce=WATCH_DEBOUNCE, polling=False, jobs=None, manifest=None,
+          watcher=None, stop=None):
+    if patterns is None:
+        patterns = DEFAULT_PATTERNS
+    get_prefilter(patterns)
+    
+    if watcher is None:
+        watcher = create_watcher(polling)
+    pending = {}
+    seen = {}
+    hashes = {}
+    ignored = set()
+    
+    try:
+        for path in paths:
+            watcher.add(path)
+        
+        files, missing = collect_files(paths)
+        if files:
+            run_batch('hide', files, patterns, jobs, backup, manifest)
+        if manifest is not None:
+            manifest = Manifest(manifest)
+            ignored = {manifest.key(manifest.path), manifest.key(manifest.path + '.tmp')}
+        print(f"Watching {len(paths)} directories for changes ({watcher.method})", flush=True)
+        
+        while stop is None or not stop.is_set():
+            timeout = min(pending.values()) - time.monotonic() if pending else WATCH_POLL_INTERVAL
+            for file_path in watcher.read(max(timeout, 0)):
+                if not _is_artifact(file_path) and os.path.abspath(file_path) not in ignored:
+                    pending[file_path] = time.monotonic() + debounce
+            
+            now = time.monotonic()
+            for file_path in [file_path for file_path, deadline in pending.items() if deadline <= now]:
+                del pending[file_path]
+                _watch_file(file_path, patterns, backup, seen, manifest, hashes)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+def run_lookup(paths, line=None, offset=None, redacted=True):
+    if len(paths) != 1 or (line is None) == (offset is None):
+        print("Error: lookup needs one file and either --line or --offset", file=sys.stderr)
+        sys.exit(1)
+    
+    mapping_file = paths[0] if paths[0].endswith('.sensitive_map') else paths[0] + '.sensitive_map'
+    if not os.path.exists(mapping_file):
+        print(f"Error: No mapping found at '{mapping_file}'", file=sys.stderr)
+        sys.exit(1)
+    
+    index = MappingIndex(mapping_file)
+    if line is not None:
+        entries = index.at_line(line, redacted)
+    else:
+        entry = index.at(offset, redacted)
+        entries = [entry] if entry else []
+    
+    for entry in entries:
+        print(json.dumps(entry))
+    return entries
+
 def main():
     parser = argparse.ArgumentParser(description='Hide or reveal sensitive text in files')
-    parser.add_argument('action', choices=['hide', 'reveal'], help='Action to perform')
-    parser.add_argument('file', help='File to process')
+    parser.add_argument('action', choices=['hide', 'reveal', 'filter', 'lookup', 'watch'], help='Action to perform')
+    parser.add_argument('files', nargs='*', metavar='file', help='Files, directories or glob patterns to process (filter reads stdin when omitted)')
+    parser.add_argument('--files-from', help='Read additional paths from this file, one per line (- for stdin)')
+    parser.add_argument('-j', '--jobs', type=int, help='Number of worker processes when processing several files')
     parser.add_argument('--patterns', help='JSON file with custom patterns')
+    parser.add_argument('--chunk-size', type=int, help='Stream the file in chunks of this many characters')
+    parser.add_argument('--workers', type=int, help='Number of processes used to scan large files')
+    parser.add_argument('--map', help='Write the filter mapping to this file')
+    parser.add_argument('--manifest', help='Record processed files here and skip files that are unchanged since the last run')
+    parser.add_argument('--no-backup', action='store_true', help='Only write the mapping; reveal patches the originals back from it')
+    parser.add_argument('--follow', action='store_true', help='filter: keep reading the file as it grows, like tail -F')
+    parser.add_argument('--state', help='filter --follow: file that records how far the log has been read (default: FILE.sensitive_offset)')
+    parser.add_argument('--debounce', type=float, default=WATCH_DEBOUNCE, help='watch: seconds to wait after the last change to a file before hiding it')
+    parser.add_argument('--poll', action='store_true', help='watch: poll for changes instead of using inotify')
+    parser.add_argument('--line', type=int, help='lookup: show what was hidden on this line of the redacted file')
+    parser.add_argument('--offset', type=int, help='lookup: show what was hidden at this character offset of the redacted file')
+    parser.add_argument('--original', action='store_true', help='lookup: --line and --offset refer to the original file')
+    
+    args = parser.parse_intermixed_args()
+    
+    if args.action == 'filter':
+        patterns = DEFAULT_PATTERNS
+        if args.patterns:
+            if os.path.exists(args.patterns):
+                patterns = load_custom_patterns(args.patterns)
+            else:
+                print(f"Warning: Patterns file '{args.patterns}' not found. Using default patterns.", file=sys.stderr)
+        run_filter(args.files, patterns, args.chunk_size, args.map, args.follow, args.state)
+        return
+    
+    if args.action == 'lookup':
+        run_lookup(args.files, args.line, args.offset, not args.original)
+        return
+    
+    if not args.files and not args.files_from:
+        parser.error('the following arguments are required: file')
+    
+    paths = list(args.files)
+    if args.files_from:
+        if args.files_from == '-':
+            paths.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            with open(args.files_from, 'r', encoding='utf-8') as f:
+                paths.extend(line.strip() for line in f if line.strip())
     
-    args = parser.parse_args()
+    batch = len(paths) > 1 or os.path.isdir(paths[0]) or (glob.has_magic(paths[0]) and not os.path.exists(paths[0])) or bool(args.manifest)
     
-    if not os.path.exists(args.file):
-        print(f"Error: File '{args.file}' not found")
+    if not batch and not os.path.exists(paths[0]):
+        print(f"Error: File '{paths[0]}' not found")
         sys.exit(1)
     
-    if args.action == 'hide':
+    patterns = None
+    if args.action in ('hide', 'watch'):
         patterns = DEFAULT_PATTERNS
         if args.patterns:
             if os.path.exists(args.patterns):
                 patterns = load_custom_patterns(args.patterns)
             else:
                 print(f"Warning: Patterns file '{args.patterns}' not found. Using default patterns.")
-        
-        hide_sensitive_text(args.file, patterns)
+    
+    if args.action == 'watch':
+        for path in paths:
+            if not os.path.isdir(path):
+                print(f"Error: '{path}' is not a directory")
+                sys.exit(1)
+        watch(paths, patterns, not args.no_backup, args.debounce, args.poll, args.jobs, args.manifest)
+        return
+    
+    if batch:
+        files, missing = collect_files(paths, args.action)
+        for path in missing:
+            print(f"Error: File '{path}' not found")
+        summary = run_batch(args.action, files, patterns, args.jobs, not args.no_backup, args.manifest)
+        if missing or summary['errors']:
+            sys.exit(1)
+        return
+    
+    if args.action == 'hide':
+        options = {}
+        if args.chunk_size:
+            options['chunk_size'] = args.chunk_size
+        if args.workers:
+            options['workers'] = args.workers
+        if args.no_backup:
+            options['backup'] = False
+        hide_sensitive_text(paths[0], patterns, **options)
     elif args.action == 'reveal':
-        reveal_sensitive_text(args.file)
+        reveal_sensitive_text(paths[0])
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -4,13 +4,13 @@ import os
 import tempfile
 import threading
 import time
-import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'standalone-script'))
 
 from sensitive_text_processor import (
     hide_sensitive_text,
+    read_mapping,
     reveal_sensitive_text,
     DEFAULT_PATTERNS
 )
@@ -260,12 +260,12 @@ class TestConcurrentFileOperations(unittest.TestCase):
         
         mapping_file = file_path + '.sensitive_map'
         with open(mapping_file, 'r') as f:
-            original_mappings = json.load(f)
+            original_mappings = read_mapping(f)
         
         def check_mapping_integrity():
             try:
                 with open(mapping_file, 'r') as f:
-                    mappings = json.load(f)
+                    mappings = read_mapping(f)
                     self.assertIsInstance(mappings, list)
                     for mapping in mappings:
                         self.assertIn('original', mapping)
@@ -285,7 +285,7 @@ class TestConcurrentFileOperations(unittest.TestCase):
             t.join()
         
         with open(mapping_file, 'r') as f:
-            final_mappings = json.load(f)
+            final_mappings = read_mapping(f)
         
         self.assertEqual(len(original_mappings), len(final_mappings))
     
@@ -326,6 +326,28 @@ Final line
             self.assertNotIn(f'pattern_{i:03d}', content)
         
         self.assertLess(process_time, 5)
+        
+        log = '\n'.join(f"Log entry {i}: request handled in {i % 97}ms status=ok" for i in range(50000))
+        log += '\npattern_000 pattern_099'
+        
+        def best_time(active_patterns):
+            times = []
+            for _ in range(3):
+                with open(self.temp_file_path, 'w') as f:
+                    f.write(log)
+                start_time = time.perf_counter()
+                hide_sensitive_text(self.temp_file_path, active_patterns)
+                times.append(time.perf_counter() - start_time)
+                for ext in ['.sensitive_backup', '.sensitive_map']:
+                    os.remove(self.temp_file_path + ext)
+            return min(times)
+        
+        single_time = best_time(loaded_patterns[:1])
+        many_time = best_time(loaded_patterns)
+        
+        print(f"\n1 pattern: {single_time*1000:.2f}ms, 100 patterns: {many_time*1000:.2f}ms")
+        
+        self.assertLess(many_time, single_time * 3)
     
     def test_greedy_vs_nongreedy_patterns(self):
         patterns = [
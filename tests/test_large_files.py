@@ -10,6 +10,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'standalone-scr
 
 from sensitive_text_processor import (
     hide_sensitive_text,
+    read_mapping,
+    hide_sensitive_text_mmap,
     reveal_sensitive_text,
     DEFAULT_PATTERNS
 )
@@ -151,6 +153,23 @@ class TestLargeFileHandling(unittest.TestCase):
         self.assertEqual(len(revealed_content), len(content))
         
         self.assertLess(hide_time, 10)
+        
+        hide_sensitive_text(self.temp_file_path)
+        with open(self.temp_file_path + '.sensitive_map', 'r') as f:
+            full_mapping = read_mapping(f)
+        reveal_sensitive_text(self.temp_file_path)
+        
+        hide_sensitive_text(self.temp_file_path, chunk_size=64 * 1024)
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(f.read(), hidden_content)
+        with open(self.temp_file_path + '.sensitive_map', 'r') as f:
+            self.assertEqual(read_mapping(f), full_mapping)
+        
+        reveal_sensitive_text(self.temp_file_path)
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(f.read(), content)
     
     def test_many_sensitive_items(self):
         lines = []
@@ -174,8 +193,7 @@ class TestLargeFileHandling(unittest.TestCase):
         process_time = time.time() - start_time
         
         with open(self.temp_file_path + '.sensitive_map', 'r') as f:
-            import json
-            mappings = json.load(f)
+            mappings = read_mapping(f)
         
         self.assertGreater(len(mappings), 7000)
         
@@ -263,6 +281,75 @@ class TestLargeFileHandling(unittest.TestCase):
         self.assertLess(peak_mb, 100)
         
         reveal_sensitive_text(self.temp_file_path)
+        
+        chunk_size = 64 * 1024
+        tracemalloc.start()
+        
+        hide_sensitive_text(self.temp_file_path, chunk_size=chunk_size)
+        
+        current, streaming_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        self.assertLess(streaming_peak, len(content) / 2)
+        self.assertLess(streaming_peak, 16 * chunk_size)
+        
+        reveal_sensitive_text(self.temp_file_path)
+    
+    def test_memory_mapped_hide(self):
+        content = self.generate_large_content(2, sensitive_density=0.002)
+        content += "\ncontact: admin@example.com\n"
+        
+        with open(self.temp_file_path, 'w') as f:
+            f.write(content)
+        
+        hide_sensitive_text(self.temp_file_path)
+        with open(self.temp_file_path, 'r') as f:
+            expected = f.read()
+        with open(self.temp_file_path + '.sensitive_map', 'r') as f:
+            expected_mapping = read_mapping(f)
+        reveal_sensitive_text(self.temp_file_path)
+        
+        import tracemalloc
+        tracemalloc.start()
+        
+        self.assertGreater(hide_sensitive_text_mmap(self.temp_file_path), 0)
+        
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        self.assertLess(peak, len(content) / 2)
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(f.read(), expected)
+        with open(self.temp_file_path + '.sensitive_map', 'r') as f:
+            self.assertEqual(read_mapping(f), expected_mapping)
+        
+        reveal_sensitive_text(self.temp_file_path)
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(f.read(), content)
+    
+    def test_parallel_single_file_matches_sequential(self):
+        content = self.generate_large_content(2, sensitive_density=0.005)
+        content += "\ncontact: admin@example.com\n"
+        
+        results = []
+        for workers in (1, 4):
+            with open(self.temp_file_path, 'w') as f:
+                f.write(content)
+            
+            hide_sensitive_text(self.temp_file_path, workers=workers)
+            
+            with open(self.temp_file_path, 'r') as f:
+                hidden = f.read()
+            with open(self.temp_file_path + '.sensitive_map', 'r') as f:
+                mapping = read_mapping(f)
+            results.append((hidden, mapping))
+            
+            reveal_sensitive_text(self.temp_file_path)
+        
+        self.assertEqual(results[0], results[1])
+        self.assertGreater(len(results[1][1]), 0)
     
     def test_incremental_file_growth(self):
         sizes = [0.1, 0.5, 1, 2]
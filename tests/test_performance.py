@@ -6,6 +6,7 @@ import tempfile
 import random
 import string
 import statistics
+import re
 from contextlib import contextmanager
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'standalone-script'))
@@ -14,6 +15,7 @@ from sensitive_text_processor import (
     hide_sensitive_text,
     reveal_sensitive_text,
     load_custom_patterns,
+    pattern_cache,
     DEFAULT_PATTERNS
 )
 
@@ -300,6 +302,18 @@ class TestPerformanceBenchmarks(unittest.TestCase):
                 if os.path.exists(backup_file):
                     os.remove(backup_file)
     
+    def test_many_findings_scale_linearly(self):
+        results = []
+        
+        for items in [5000, 20000]:
+            content = ''.join(f"test{i}@example.com " for i in range(items))
+            stats = self.benchmark_operation(hide_sensitive_text, content, iterations=3)
+            results.append(stats['min'])
+            
+            print(f"\n{items} findings: {stats['min']*1000:.2f}ms")
+        
+        self.assertLess(results[1] / results[0], 4 * 2.5)
+    
     def test_pattern_caching_benefit(self):
         content = self.generate_test_content(1000, sensitive_ratio=0.3)
         
@@ -332,6 +346,39 @@ class TestPerformanceBenchmarks(unittest.TestCase):
             print(f"\nPattern caching benefit:")
             print(f"  First run: {first_run_times[0]*1000:.2f}ms")
             print(f"  Subsequent mean: {mean_subsequent*1000:.2f}ms")
+        
+        rule_sets = [
+            [{'pattern': rf'\bsecret_{set_index}_{i}_[A-Za-z0-9]+\b', 'replacement': f'${{SECRET_{i}}}'}
+             for i in range(30)]
+            for set_index in range(40)
+        ]
+        small_content = "secret_0_0_abc and some ordinary log text\n" * 20
+        
+        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', dir=self.temp_dir)
+        temp_file.close()
+        
+        def run_all_rule_sets():
+            with measure_time() as elapsed:
+                for rule_set in rule_sets:
+                    with open(temp_file.name, 'w') as f:
+                        f.write(small_content)
+                    hide_sensitive_text(temp_file.name, rule_set)
+                return elapsed()
+        
+        pattern_cache.clear()
+        re.purge()
+        cold_time = run_all_rule_sets()
+        cold_info = pattern_cache.info()
+        warm_time = run_all_rule_sets()
+        warm_info = pattern_cache.info()
+        
+        print(f"  {len(rule_sets)} rule sets cold: {cold_time*1000:.2f}ms")
+        print(f"  {len(rule_sets)} rule sets warm: {warm_time*1000:.2f}ms")
+        
+        self.assertEqual(cold_info['hits'], 0)
+        self.assertGreaterEqual(warm_info['hits'], len(rule_sets))
+        self.assertEqual(warm_info['misses'], cold_info['misses'])
+        self.assertLess(warm_time, cold_time / 2)
     
     def test_parallel_file_processing_overhead(self):
         from concurrent.futures import ThreadPoolExecutor, as_completed
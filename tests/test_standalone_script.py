@@ -3,7 +3,9 @@ import sys
 import os
 import json
 import tempfile
+import shutil
 import re
+import time
 from unittest.mock import patch, mock_open, MagicMock
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'standalone-script'))
@@ -11,8 +13,37 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'standalone-scr
 from sensitive_text_processor import (
     DEFAULT_PATTERNS,
     hide_sensitive_text,
+    read_mapping,
+    load_mapping,
+    write_mapping,
+    MappingIndex,
     reveal_sensitive_text,
     load_custom_patterns,
+    apply_spans,
+    redact_text,
+    PatternScanner,
+    PatternCache,
+    get_scanner,
+    pattern_cache,
+    parse_flags,
+    required_literals,
+    is_line_local,
+    get_prefilter,
+    find_spans,
+    hide_sensitive_text_mmap,
+    find_rule_spans,
+    merge_shard_spans,
+    shard_bounds,
+    collect_files,
+    run_batch,
+    filter_stream,
+    follow_file,
+    select_patterns,
+    watch,
+    create_watcher,
+    PollingWatcher,
+    redact_stream,
+    ruleset_hash,
     main
 )
 
@@ -148,7 +179,7 @@ class TestHideSensitiveText(unittest.TestCase):
         hide_sensitive_text(self.temp_file_path)
         
         with open(self.temp_file_path + '.sensitive_map', 'r') as f:
-            mappings = json.load(f)
+            mappings = read_mapping(f)
         
         self.assertEqual(len(mappings), 1)
         self.assertEqual(mappings[0]['original'], 'test@example.com')
@@ -204,6 +235,41 @@ class TestRevealSensitiveText(unittest.TestCase):
         
         self.assertEqual(content, "Email: ${EMAIL}")
     
+    def test_reveal_from_mapping_without_backup(self):
+        original_content = "Email: test@example.com\nSSN: 123-45-6789\nIP: 10.0.0.1\n" * 50
+        with open(self.temp_file_path, 'w') as f:
+            f.write(original_content)
+        
+        with patch('builtins.print'):
+            hide_sensitive_text(self.temp_file_path, backup=False)
+        
+        self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_backup'))
+        
+        with patch('builtins.print'):
+            self.assertTrue(reveal_sensitive_text(self.temp_file_path, chunk_size=7))
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(f.read(), original_content)
+        self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_map'))
+    
+    def test_reveal_from_mapping_stops_on_edited_placeholder(self):
+        with open(self.temp_file_path, 'w') as f:
+            f.write("Email: test@example.com")
+        
+        with patch('builtins.print'):
+            hide_sensitive_text(self.temp_file_path, chunk_size=8, backup=False)
+        
+        with open(self.temp_file_path, 'w') as f:
+            f.write("Email: ${EMAIL_EDITED}")
+        
+        with patch('builtins.print'):
+            self.assertFalse(reveal_sensitive_text(self.temp_file_path))
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(f.read(), "Email: ${EMAIL_EDITED}")
+        self.assertTrue(os.path.exists(self.temp_file_path + '.sensitive_map'))
+        self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_tmp'))
+    
     def test_reveal_removes_all_backup_files(self):
         with open(self.temp_file_path, 'w') as f:
             f.write("Email: test@example.com")
@@ -218,6 +284,799 @@ class TestRevealSensitiveText(unittest.TestCase):
         self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_backup'))
         self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_map'))
 
+class TestRedactText(unittest.TestCase):
+    
+    def legacy_redact(self, content, patterns):
+        for pattern_config in patterns:
+            for match in reversed(list(re.finditer(pattern_config['pattern'], content, pattern_config.get('flags', 0)))):
+                content = content[:match.start()] + pattern_config['replacement'] + content[match.end():]
+        return content
+    
+    def test_apply_spans(self):
+        content = "a secret and another secret"
+        spans = [(2, 8, '${S}'), (21, 27, '${S}')]
+        
+        self.assertEqual(apply_spans(content, spans), "a ${S} and another ${S}")
+        self.assertEqual(apply_spans(content, []), content)
+    
+    def test_matches_per_match_slicing(self):
+        content = "\n".join([
+            "Email: test@example.com, SSN: 123-45-6789",
+            "password=123-45-6789 at 192.168.1.1",
+            "Card 1234-5678-9012-3456 and api_key_abcdef1234567890ghij",
+        ] * 50)
+        
+        redacted, replacements = redact_text(content, DEFAULT_PATTERNS)
+        
+        self.assertEqual(redacted, self.legacy_redact(content, DEFAULT_PATTERNS))
+        self.assertNotIn("123-45-6789", redacted)
+    
+    def test_replacement_offsets(self):
+        redacted, replacements = redact_text("a@b.com x c@d.org", DEFAULT_PATTERNS)
+        
+        self.assertEqual(redacted, "${EMAIL} x ${EMAIL}")
+        self.assertEqual([(r['start'], r['end'], r['original']) for r in replacements],
+                         [(0, 7, 'a@b.com'), (10, 17, 'c@d.org')])
+
+class TestPatternScanner(unittest.TestCase):
+    
+    def scan(self, scanner, content):
+        return [(start, end, rule['replacement']) for start, end, rule in scanner.scan(content)]
+    
+    def test_default_patterns_use_one_regex(self):
+        scanner = PatternScanner(DEFAULT_PATTERNS)
+        
+        self.assertEqual(len(scanner.sources), 1)
+        self.assertEqual(self.scan(scanner, "mail a@b.com from 10.0.0.1"),
+                         [(5, 12, '${EMAIL}'), (18, 26, '${IP_ADDRESS}')])
+    
+    def test_flags_apply_per_pattern(self):
+        scanner = PatternScanner([
+            {'pattern': r'secret', 'replacement': '${LOWER}'},
+            {'pattern': r'token', 'replacement': '${ANY}', 'flags': re.IGNORECASE}
+        ])
+        
+        self.assertEqual(self.scan(scanner, "SECRET secret TOKEN"),
+                         [(7, 13, '${LOWER}'), (14, 19, '${ANY}')])
+    
+    def test_backreference_patterns_scanned_separately(self):
+        scanner = PatternScanner([
+            {'pattern': r'(\d{3})-\1', 'replacement': '${REPEATED}'},
+            {'pattern': r'\d{3}-\d{3}', 'replacement': '${PAIR}'}
+        ])
+        
+        self.assertEqual(len(scanner.sources), 2)
+        self.assertEqual(self.scan(scanner, "123-456 777-777"),
+                         [(0, 7, '${PAIR}'), (8, 15, '${REPEATED}')])
+    
+    def test_earlier_pattern_wins_at_same_position(self):
+        scanner = PatternScanner([
+            {'pattern': r'\btest\b', 'replacement': '${WORD}'},
+            {'pattern': r'test', 'replacement': '${ANY}'}
+        ])
+        
+        self.assertEqual(self.scan(scanner, "test testing"),
+                         [(0, 4, '${WORD}'), (5, 9, '${ANY}')])
+
+class TestPriorityResolution(unittest.TestCase):
+    
+    def spans(self, patterns, content):
+        return [(start, end, rule['replacement']) for start, end, rule in find_spans(content, patterns)]
+    
+    def test_higher_priority_wins_over_earlier_match(self):
+        patterns = [
+            {'pattern': r'user=\S+', 'replacement': '${USER}'},
+            {'pattern': r'[\w.]+@[\w.]+', 'replacement': '${EMAIL}', 'priority': 1}
+        ]
+        
+        self.assertEqual(self.spans(patterns, "user=bob@example.com"), [(5, 20, '${EMAIL}')])
+        self.assertEqual(self.spans(patterns[:1] + [dict(patterns[1], priority=0)], "user=bob@example.com"),
+                         [(0, 20, '${USER}')])
+    
+    def test_longest_match_wins_at_equal_priority(self):
+        patterns = [
+            {'pattern': r'\d{3}-\d{2}-\d{4}', 'replacement': '${SSN}', 'priority': 0},
+            {'pattern': r'(?:\d{4}-){3}\d{4}', 'replacement': '${CREDIT_CARD}'}
+        ]
+        
+        self.assertEqual(self.spans(patterns, "card 1234-5678-9012-3456 ssn 123-45-6789"),
+                         [(5, 24, '${CREDIT_CARD}'), (29, 40, '${SSN}')])
+    
+    def test_list_order_breaks_remaining_ties(self):
+        patterns = [
+            {'pattern': r'test', 'replacement': '${FIRST}', 'priority': 2},
+            {'pattern': r'test', 'replacement': '${SECOND}', 'priority': 2}
+        ]
+        
+        self.assertEqual(self.spans(patterns, "a test"), [(2, 6, '${FIRST}')])
+    
+    def test_streaming_matches_in_memory(self):
+        import io
+        patterns = DEFAULT_PATTERNS + [{'pattern': r'password\s*[:=]\s*\S+', 'replacement': '${SECRET}', 'priority': 5}]
+        content = "password=a@b.com ip 10.0.0.1 password: 123-45-6789\n" * 40
+        
+        expected, replacements = redact_text(content, patterns)
+        for chunk_size in (3, 17, 100):
+            output = io.StringIO()
+            spans = list(redact_stream(io.StringIO(content), output, patterns, chunk_size))
+            self.assertEqual(output.getvalue(), expected)
+            self.assertEqual([span[:2] for span in spans], [(r['start'], r['end']) for r in replacements])
+    
+    def test_priority_changes_ruleset_hash(self):
+        pattern = {'pattern': 'secret', 'replacement': '${SECRET}'}
+        self.assertNotEqual(ruleset_hash([pattern]), ruleset_hash([dict(pattern, priority=1)]))
+
+class TestPatternCache(unittest.TestCase):
+    
+    def test_lru_eviction_and_counters(self):
+        cache = PatternCache(maxsize=2)
+        
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        self.assertEqual(cache.get('a', lambda: 10), 1)
+        cache.get('c', lambda: 3)
+        
+        self.assertEqual(cache.get('b', lambda: 20), 20)
+        self.assertEqual(cache.info(), {'hits': 1, 'misses': 4, 'size': 2, 'maxsize': 2})
+    
+    def test_scanner_shared_across_equivalent_rule_sets(self):
+        pattern_cache.clear()
+        
+        first = get_scanner([{'pattern': r'secret', 'replacement': '${S}', 'flags': 'IGNORECASE'}])
+        second = get_scanner([{'pattern': r'secret', 'replacement': '${S}', 'flags': re.IGNORECASE}])
+        
+        self.assertIs(first, second)
+        self.assertEqual(pattern_cache.info()['hits'], 1)
+    
+    def test_parse_flags(self):
+        self.assertEqual(parse_flags('IGNORECASE|DOTALL'), re.IGNORECASE | re.DOTALL)
+        self.assertEqual(parse_flags('MULTILINE'), re.MULTILINE)
+        self.assertEqual(parse_flags(2), 2)
+        self.assertEqual(parse_flags(None), 0)
+
+class TestLiteralPrefilter(unittest.TestCase):
+    
+    def test_required_literals_from_defaults(self):
+        literals = {
+            p['replacement']: required_literals(p['pattern'], p.get('flags', 0))
+            for p in DEFAULT_PATTERNS
+        }
+        
+        self.assertEqual(literals['${EMAIL}'], [('@', False)])
+        self.assertIsNone(literals['${CREDIT_CARD}'])
+        self.assertEqual(literals['${API_KEY}'], [('api', True)])
+        self.assertEqual(literals['${PASSWORD}'], [('password', True)])
+    
+    def test_requires_overrides_detected_literal(self):
+        self.assertEqual(required_literals(r'token-\w+', requires='token'), [('token', False)])
+        self.assertEqual(required_literals(r'\d+', requires=['id=', 'ref=']), [('id=', False), ('ref=', False)])
+    
+    def test_patterns_without_literals_are_skipped(self):
+        content = "plain log line without any secrets\n" * 10
+        active, local = get_prefilter(DEFAULT_PATTERNS).plan(content)
+        
+        self.assertEqual([DEFAULT_PATTERNS[index]['replacement'] for index in active], ['${CREDIT_CARD}'])
+    
+    def test_line_local_detection(self):
+        self.assertTrue(is_line_local(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}'))
+        self.assertFalse(is_line_local(r'password\s*=\s*\S+'))
+        self.assertFalse(is_line_local(r'key.*end', re.DOTALL))
+        self.assertFalse(is_line_local(r'token$'))
+    
+    def test_prefiltered_scan_matches_full_scan(self):
+        patterns = DEFAULT_PATTERNS + [{'pattern': r'id=[^z]+;', 'replacement': '${ID}'}]
+        content = ("filler text " * 100 + "\n") * 20
+        content += "mail a@b.com\nid=7\nx;\n" + ("more filler " * 200 + "\n") * 5
+        content += "password: hunter2 192.168.0.1\n"
+        
+        expected = [(s, e, r['replacement']) for s, e, r in PatternScanner(patterns).scan(content)]
+        actual = [(s, e, r['replacement']) for s, e, r in find_spans(content, patterns)]
+        
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(actual), 4)
+
+    def test_overlapping_literals_are_all_found(self):
+        prefilter = get_prefilter([
+            {'pattern': 'abc', 'replacement': '${A}'},
+            {'pattern': 'bcd', 'replacement': '${B}'},
+            {'pattern': 'CDE', 'replacement': '${C}', 'flags': 'IGNORECASE'},
+            {'pattern': 'token', 'replacement': '${T}'},
+            {'pattern': '@', 'replacement': '${AT}'},
+        ])
+        
+        self.assertEqual(prefilter.find_literals("xabcde"), {0, 1, 2})
+        self.assertEqual(prefilter.find_literals("@" * 500 + "token"), {3, 4})
+        self.assertEqual(prefilter.find_literals("@" * 500 + "token", 0, 500), {4})
+
+    def test_line_mode_compiles_no_scanner_per_literal_subset(self):
+        import io
+        import itertools
+        patterns = [{'pattern': f'key{i:02d}=\\w+', 'replacement': f'${{K{i}}}'} for i in range(12)]
+        patterns.append({'pattern': r'\d{6}', 'replacement': '${PIN}', 'requires': 'pin'})
+        lines = [' '.join(f'key{i:02d}=v' for i in combo) + ' 123456\n' for combo in itertools.combinations(range(12), 3)]
+        lines.append("pin 654321\n")
+        
+        pattern_cache.clear()
+        output = io.StringIO()
+        filter_stream(io.StringIO(''.join(lines)), output, patterns)
+        
+        redacted = output.getvalue().splitlines()
+        self.assertEqual(redacted[0], "${K0} ${K1} ${K2} 123456")
+        self.assertEqual(redacted[-2:], ["${K9} ${K10} ${K11} 123456", "pin ${PIN}"])
+        self.assertLessEqual(pattern_cache.info()['size'], 2)
+
+class TestShardMerge(unittest.TestCase):
+    
+    def test_merge_resyncs_after_span_crossing_shard_boundary(self):
+        patterns = [
+            {'pattern': r'BEGIN[^!]*!', 'replacement': '${BLOCK}'},
+            {'pattern': r'\d{3}', 'replacement': '${NUM}'}
+        ]
+        content = b"111 BEGIN 222\n333 444!\n555\n666 BEGIN\n777!\n"
+        bounds = shard_bounds(content, 4)
+        
+        shard_spans = []
+        for start, end in bounds:
+            shard_spans.append([
+                span for span in find_rule_spans(content, patterns, start, len(content))
+                if span[0] < end
+            ])
+        
+        merged = list(merge_shard_spans(content, patterns, bounds, shard_spans, len(content)))
+        
+        self.assertGreater(len(bounds), 1)
+        self.assertEqual(merged, list(find_rule_spans(content, patterns)))
+
+class TestBatchMode(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.files = {
+            'a.txt': "Email: test@example.com",
+            'b.txt': "Nothing to see here",
+            os.path.join('logs', 'app.log'): "client 10.0.0.1 and user@example.com",
+            os.path.join('.git', 'config'): "url = git@example.com"
+        }
+        for name, content in self.files.items():
+            path = os.path.join(self.temp_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_collect_files_walks_directories_and_globs(self):
+        files, missing = collect_files([self.temp_dir, os.path.join(self.temp_dir, '*.txt'), 'missing.txt'])
+        
+        names = sorted(os.path.relpath(f, self.temp_dir) for f in files)
+        self.assertEqual(names, ['a.txt', 'b.txt', os.path.join('logs', 'app.log')])
+        self.assertEqual(missing, ['missing.txt'])
+    
+    def test_run_batch_hides_and_reveals(self):
+        files, missing = collect_files([self.temp_dir])
+        
+        with patch('builtins.print'):
+            summary = run_batch('hide', files, jobs=2)
+        
+        self.assertEqual(summary['files'], 3)
+        self.assertEqual(summary['changed'], 2)
+        self.assertEqual(summary['occurrences'], 3)
+        self.assertEqual(summary['errors'], [])
+        
+        reveal_files, missing = collect_files([self.temp_dir], 'reveal')
+        self.assertEqual(len(reveal_files), 2)
+        
+        with patch('builtins.print'):
+            summary = run_batch('reveal', reveal_files, jobs=1)
+        
+        self.assertEqual(summary['changed'], 2)
+        for name, content in self.files.items():
+            with open(os.path.join(self.temp_dir, name), 'r') as f:
+                self.assertEqual(f.read(), content)
+    
+    def test_manifest_skips_unchanged_files(self):
+        manifest = os.path.join(self.temp_dir, 'manifest.json')
+        files, missing = collect_files([self.temp_dir])
+        
+        with patch('builtins.print'):
+            summary = run_batch('hide', files, jobs=1, manifest=manifest)
+        self.assertEqual(summary['changed'], 2)
+        self.assertEqual(summary['current'], 0)
+        
+        files, missing = collect_files([self.temp_dir])
+        self.assertIn(manifest, files)
+        with patch('sensitive_text_processor.hide_sensitive_text') as mock_hide:
+            with patch('builtins.print') as mock_print:
+                summary = run_batch('hide', files, jobs=1, manifest=manifest)
+        mock_hide.assert_not_called()
+        self.assertEqual(summary['files'], 3)
+        self.assertEqual(summary['current'], 3)
+        self.assertIn("3 files up to date", [call.args[0] for call in mock_print.call_args_list])
+        
+        touched = os.path.join(self.temp_dir, 'b.txt')
+        os.utime(touched, ns=(0, 0))
+        edited = os.path.join(self.temp_dir, 'a.txt')
+        with open(edited, 'a') as f:
+            f.write(" and admin@example.com")
+        
+        with patch('builtins.print'):
+            summary = run_batch('hide', files, jobs=2, manifest=manifest)
+        self.assertEqual(summary['current'], 2)
+        self.assertEqual(summary['occurrences'], 1)
+        
+        with patch('builtins.print'):
+            summary = run_batch('hide', files, jobs=1, manifest=manifest, patterns=DEFAULT_PATTERNS[:1])
+        self.assertEqual(summary['current'], 0)
+    
+    def test_main_accepts_directory(self):
+        with patch('sys.argv', ['script.py', 'hide', self.temp_dir, '--jobs', '1']):
+            with patch('builtins.print') as mock_print:
+                main()
+        
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        self.assertTrue(any(line.startswith('Processed 3 files') for line in printed))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'a.txt.sensitive_backup')))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, '.git', 'config.sensitive_backup')))
+
+class TestWatchMode(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.temp_dir, 'existing.txt'), 'w') as f:
+            f.write("Email: old@example.com")
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+    
+    def read(self, name):
+        with open(os.path.join(self.temp_dir, name), 'r') as f:
+            return f.read()
+    
+    def run_watch(self, watcher):
+        import threading
+        stop = threading.Event()
+        thread = threading.Thread(target=watch, args=([self.temp_dir],),
+                                  kwargs={'debounce': 0.05, 'watcher': watcher, 'stop': stop})
+        with patch('builtins.print') as mock_print:
+            thread.start()
+            try:
+                self.assertTrue(self.wait_for(lambda: "${EMAIL}" in self.read('existing.txt')))
+                self.assertTrue(self.wait_for(lambda: mock_print.call_count >= 2))
+                
+                os.makedirs(os.path.join(self.temp_dir, 'bundle'))
+                with open(os.path.join(self.temp_dir, 'bundle', 'debug.log'), 'w') as f:
+                    f.write("connect to 10.1.2.3 as admin@example.com")
+                self.assertTrue(self.wait_for(lambda: "${IP_ADDRESS}" in self.read(os.path.join('bundle', 'debug.log'))))
+                time.sleep(0.3)
+            finally:
+                stop.set()
+                thread.join()
+        
+        printed = [call.args[0] for call in mock_print.call_args_list]
+        hidden = [line for line in printed if 'debug.log: hidden' in line]
+        self.assertEqual(hidden, [f"{os.path.join(self.temp_dir, 'bundle', 'debug.log')}: hidden 2 sensitive text occurrences"])
+        self.assertEqual(load_mapping(os.path.join(self.temp_dir, 'bundle', 'debug.log.sensitive_map'))[1]['original'],
+                         'admin@example.com')
+    
+    def test_watch_records_files_in_manifest(self):
+        import threading
+        manifest = os.path.join(self.temp_dir, 'manifest.json')
+        new_file = os.path.join(self.temp_dir, 'new.txt')
+        stop = threading.Event()
+        thread = threading.Thread(target=watch, args=([self.temp_dir],),
+                                  kwargs={'debounce': 0.05, 'watcher': PollingWatcher(interval=0.05),
+                                          'manifest': manifest, 'stop': stop})
+        with patch('builtins.print') as mock_print:
+            thread.start()
+            try:
+                self.assertTrue(self.wait_for(lambda: os.path.exists(manifest)))
+                with open(new_file, 'w') as f:
+                    f.write("mail new@example.com")
+                self.assertTrue(self.wait_for(lambda: "${EMAIL}" in self.read('new.txt')))
+                time.sleep(0.3)
+            finally:
+                stop.set()
+                thread.join()
+        
+        with open(manifest, 'r') as f:
+            files = json.load(f)['files']
+        self.assertIn(os.path.abspath(new_file), files)
+        self.assertNotIn(os.path.abspath(manifest), files)
+        self.assertFalse(os.path.exists(manifest + '.sensitive_map'))
+        printed = [str(call.args[0]) for call in mock_print.call_args_list if call.args]
+        self.assertEqual([line for line in printed if 'new.txt: hidden' in line], [f"{new_file}: hidden 1 sensitive text occurrences"])
+    
+    def test_polling_watch_hides_new_files(self):
+        self.run_watch(PollingWatcher(interval=0.05))
+    
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux only")
+    def test_inotify_watch_hides_new_files(self):
+        self.run_watch(create_watcher())
+
+class TestFilterMode(unittest.TestCase):
+    
+    def setUp(self):
+        self.content = (
+            "Email: test@example.com\r\n"
+            "nothing here\n"
+            "Server 192.168.1.1 password: hunter2\n"
+            "last line user@example.org"
+        )
+    
+    def test_line_mode_redacts_each_line(self):
+        import io
+        output = io.StringIO()
+        mapping = io.StringIO()
+        
+        count = filter_stream(io.StringIO(self.content), output, mapping=mapping)
+        expected, replacements = redact_text(self.content, DEFAULT_PATTERNS)
+        
+        self.assertEqual(output.getvalue(), expected)
+        self.assertEqual(count, 4)
+        mapping.seek(0)
+        self.assertEqual(read_mapping(mapping), replacements)
+    
+    def test_chunk_mode_matches_whole_text(self):
+        import io
+        output = io.StringIO()
+        
+        filter_stream(io.StringIO(self.content), output, chunk_size=5)
+        
+        self.assertEqual(output.getvalue(), redact_text(self.content, DEFAULT_PATTERNS)[0])
+    
+    def test_line_mode_flushes_every_line(self):
+        import io
+        
+        class Output(io.StringIO):
+            flushed = []
+            def flush(self):
+                self.flushed.append(self.getvalue())
+        
+        output = Output()
+        filter_stream(io.StringIO("a@b.com\nplain\n"), output)
+        
+        self.assertEqual(output.flushed[0], "${EMAIL}\n")
+    
+    def test_main_filter_reads_stdin(self):
+        import io
+        stdout = io.StringIO()
+        
+        with patch('sys.argv', ['script.py', 'filter']):
+            with patch('sys.stdin', io.StringIO(self.content)), patch('sys.stdout', stdout):
+                main()
+        
+        self.assertEqual(stdout.getvalue(), redact_text(self.content, DEFAULT_PATTERNS)[0])
+
+class TestFollowMode(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, 'app.log')
+        with open(self.log_path, 'w') as f:
+            f.write("start user@example.com\n")
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def append(self, text, path=None):
+        with open(path or self.log_path, 'a') as f:
+            f.write(text)
+    
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+    
+    def start(self):
+        import io
+        import threading
+        output = io.StringIO()
+        stop = threading.Event()
+        thread = threading.Thread(target=follow_file, args=(self.log_path, output),
+                                  kwargs={'poll_interval': 0.02, 'stop': stop})
+        thread.start()
+        return output, stop, thread
+    
+    def finish(self, stop, thread):
+        stop.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+    
+    def test_emits_complete_lines_as_the_file_grows(self):
+        output, stop, thread = self.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: output.getvalue() == "start ${EMAIL}\n"))
+            self.append("ip 10.0.0.1 and par")
+            self.append("tial a@b.com\n")
+            self.assertTrue(self.wait_for(lambda: output.getvalue().endswith("partial ${EMAIL}\n")))
+        finally:
+            self.finish(stop, thread)
+        
+        self.assertEqual(output.getvalue(), "start ${EMAIL}\nip ${IP_ADDRESS} and partial ${EMAIL}\n")
+        with open(self.log_path + '.sensitive_offset', 'r') as f:
+            state = json.load(f)
+        self.assertEqual(state['offset'], os.path.getsize(self.log_path))
+        self.assertEqual(state['inode'], os.stat(self.log_path).st_ino)
+    
+    def test_follows_rotation_and_truncation(self):
+        output, stop, thread = self.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: "start" in output.getvalue()))
+            os.rename(self.log_path, self.log_path + '.1')
+            self.append("late old@example.com\n", self.log_path + '.1')
+            self.append("rotated new@example.com\n")
+            self.assertTrue(self.wait_for(lambda: "rotated" in output.getvalue()))
+            with open(self.log_path, 'w') as f:
+                f.write("truncated\n")
+            self.assertTrue(self.wait_for(lambda: "truncated" in output.getvalue()))
+        finally:
+            self.finish(stop, thread)
+        
+        self.assertEqual(output.getvalue(),
+                         "start ${EMAIL}\nlate ${EMAIL}\nrotated ${EMAIL}\ntruncated\n")
+    
+    def test_partial_line_is_terminated_on_rotation(self):
+        output, stop, thread = self.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: "start" in output.getvalue()))
+            self.append("unterminated a@b.com")
+            time.sleep(0.1)
+            os.rename(self.log_path, self.log_path + '.1')
+            self.append("next line\n")
+            self.assertTrue(self.wait_for(lambda: "next line" in output.getvalue()))
+        finally:
+            self.finish(stop, thread)
+        
+        self.assertEqual(output.getvalue(), "start ${EMAIL}\nunterminated ${EMAIL}\nnext line\n")
+    
+    def test_restart_resumes_from_saved_offset(self):
+        output, stop, thread = self.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: "start" in output.getvalue()))
+        finally:
+            self.finish(stop, thread)
+        
+        self.append("while stopped 10.1.1.1\n")
+        output, stop, thread = self.start()
+        try:
+            self.assertTrue(self.wait_for(lambda: "stopped" in output.getvalue()))
+        finally:
+            self.finish(stop, thread)
+        
+        self.assertEqual(output.getvalue(), "while stopped ${IP_ADDRESS}\n")
+    
+    def test_follow_requires_a_single_file(self):
+        import io
+        with patch('sys.argv', ['script.py', 'filter', '--follow']), patch('sys.stdout', io.StringIO()):
+            with patch('sys.stderr', io.StringIO()) as stderr, self.assertRaises(SystemExit):
+                main()
+        
+        self.assertIn("--follow needs exactly one file", stderr.getvalue())
+
+class TestMappingIndex(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'app.log')
+        self.patterns = DEFAULT_PATTERNS + [{'pattern': r'BEGIN KEY\n\w+\nEND KEY', 'replacement': '${PRIVATE_KEY}'}]
+        lines = []
+        for i in range(2000):
+            if i % 3 == 0:
+                lines.append(f"user{i}@example.com logged in from 10.0.{i % 256}.1")
+            elif i == 1000:
+                lines.append("BEGIN KEY\nabc123\nEND KEY")
+            else:
+                lines.append(f"plain line {i}")
+        self.content = "\n".join(lines) + "\n"
+        with open(self.file_path, 'w') as f:
+            f.write(self.content)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def hide(self, **options):
+        with patch('builtins.print'):
+            hide_sensitive_text(self.file_path, self.patterns, **options)
+        with open(self.file_path, 'r') as f:
+            redacted = f.read()
+        with open(self.file_path + '.sensitive_map', 'r') as f:
+            return redacted, read_mapping(f)
+    
+    def test_entries_carry_original_and_redacted_coordinates(self):
+        for options in ({}, {'chunk_size': 100}, {'workers': 1}):
+            redacted, entries = self.hide(**options)
+            for entry in entries:
+                self.assertEqual(self.content[entry['start']:entry['end']], entry['original'])
+                self.assertEqual(redacted[entry['redacted_start']:entry['redacted_end']], entry['replacement'])
+                self.assertEqual(self.content.count('\n', 0, entry['start']) + 1, entry['line'])
+                self.assertEqual(redacted.count('\n', 0, entry['redacted_start']) + 1, entry['redacted_line'])
+            with patch('builtins.print'):
+                reveal_sensitive_text(self.file_path)
+    
+    def test_index_lookups(self):
+        redacted, entries = self.hide()
+        with open(self.file_path + '.sensitive_map', 'w') as f:
+            write_mapping(entries, f, stride=16)
+        index = MappingIndex(self.file_path + '.sensitive_map')
+        
+        self.assertEqual(index.count, len(entries))
+        self.assertEqual(len(index.index), (len(entries) + 15) // 16)
+        
+        redacted_lines = redacted.split('\n')
+        for line in (1, 4, 999, 1001, 1999):
+            found = index.at_line(line)
+            self.assertEqual([entry['replacement'] for entry in found],
+                             re.findall(r'\$\{[A-Z_]+\}', redacted_lines[line - 1]))
+        
+        key_entry = next(entry for entry in entries if entry['replacement'] == '${PRIVATE_KEY}')
+        self.assertEqual(index.at_line(1003, redacted=False), [e for e in entries if e['line'] == 1003])
+        self.assertEqual(index.at(key_entry['redacted_start'] + 3), key_entry)
+        self.assertEqual(index.at(key_entry['start'] + 12, redacted=False), key_entry)
+        self.assertIsNone(index.at(key_entry['redacted_end']))
+    
+    def test_main_lookup(self):
+        self.hide()
+        with patch('sys.argv', ['script.py', 'lookup', self.file_path, '--line', '1001']):
+            with patch('builtins.print') as mock_print:
+                main()
+        
+        printed = [json.loads(call.args[0]) for call in mock_print.call_args_list]
+        self.assertEqual([entry['original'] for entry in printed], ["BEGIN KEY\nabc123\nEND KEY"])
+
+class TestNewPatterns(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'app.log')
+        self.content = "".join(
+            f"user{i}@example.com order ORD-{i:05d} from 10.0.0.{i % 200}\n" for i in range(300)
+        )
+        self.new_rule = {'pattern': r'ORD-\d{5}', 'replacement': '${ORDER}'}
+        with open(self.file_path, 'w') as f:
+            f.write(self.content)
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def hide(self, patterns, **options):
+        with patch('builtins.print'):
+            return hide_sensitive_text(self.file_path, patterns, **options)
+    
+    def read(self, suffix=''):
+        with open(self.file_path + suffix, 'r') as f:
+            return f.read()
+    
+    def test_only_new_patterns_are_applied(self):
+        self.hide(DEFAULT_PATTERNS)
+        backup = self.read('.sensitive_backup')
+        
+        with patch('sensitive_text_processor.find_spans', wraps=find_spans) as spy:
+            self.assertEqual(self.hide(DEFAULT_PATTERNS + [self.new_rule]), 300)
+        self.assertEqual(spy.call_args.args[1], [self.new_rule])
+        
+        redacted = self.read()
+        self.assertNotIn('ORD-', redacted)
+        self.assertEqual(self.read('.sensitive_backup'), backup)
+        
+        entries = load_mapping(self.file_path + '.sensitive_map')
+        self.assertEqual(len(entries), 900)
+        for entry in entries:
+            self.assertEqual(self.content[entry['start']:entry['end']], entry['original'])
+            self.assertEqual(redacted[entry['redacted_start']:entry['redacted_end']], entry['replacement'])
+        
+        with patch('sensitive_text_processor.find_spans') as spy:
+            self.assertEqual(self.hide(DEFAULT_PATTERNS + [self.new_rule]), 0)
+        spy.assert_not_called()
+    
+    def test_merged_mapping_reveals_without_backup(self):
+        self.hide(DEFAULT_PATTERNS, backup=False)
+        self.hide(DEFAULT_PATTERNS + [self.new_rule], backup=False)
+        
+        self.assertFalse(os.path.exists(self.file_path + '.sensitive_backup'))
+        with patch('builtins.print'):
+            self.assertTrue(reveal_sensitive_text(self.file_path))
+        self.assertEqual(self.read(), self.content)
+    
+    def test_edited_file_is_rescanned_with_all_patterns(self):
+        self.hide(DEFAULT_PATTERNS, backup=False)
+        with open(self.file_path, 'a') as f:
+            f.write("late@example.com ORD-99999\n")
+        
+        self.assertEqual(self.hide(DEFAULT_PATTERNS + [self.new_rule], backup=False), 302)
+        self.assertNotIn('late@example.com', self.read())
+        
+        with patch('builtins.print'):
+            reveal_sensitive_text(self.file_path)
+        self.assertEqual(self.read(), self.content + "late@example.com ORD-99999\n")
+
+    def test_chunked_rehide_streams_the_file(self):
+        import tracemalloc
+        content = self.content * 100
+        with open(self.file_path, 'w') as f:
+            f.write(content)
+        self.hide(DEFAULT_PATTERNS, chunk_size=4096)
+        
+        tracemalloc.start()
+        count = self.hide(DEFAULT_PATTERNS + [self.new_rule], chunk_size=4096)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        self.assertEqual(count, 30000)
+        self.assertLess(peak, len(content) / 2)
+        self.assertNotIn('ORD-', self.read())
+        
+        with patch('builtins.print'):
+            reveal_sensitive_text(self.file_path)
+        self.assertEqual(self.read(), content)
+
+class TestScopedPatterns(unittest.TestCase):
+    
+    def setUp(self):
+        self.patterns = [
+            {'pattern': r'DB_PASS=\S+', 'replacement': '${DB_PASS}', 'files': ['*.env', 'config/*.properties']},
+            {'pattern': r'ERROR \S+', 'replacement': '${ERROR}', 'scopes': ['text.log']},
+            {'pattern': 'secret', 'replacement': '${SECRET}'}
+        ]
+    
+    def replacements(self, path=None, scope=None):
+        return [p['replacement'] for p in select_patterns(self.patterns, path, scope)]
+    
+    def test_unrestricted_patterns_always_apply(self):
+        self.assertEqual(self.replacements(), ['${SECRET}'])
+        self.assertEqual(self.replacements('notes.md'), ['${SECRET}'])
+    
+    def test_file_globs(self):
+        self.assertEqual(self.replacements('/srv/app/.env'), ['${DB_PASS}', '${SECRET}'])
+        self.assertEqual(self.replacements('config/db.properties'), ['${DB_PASS}', '${SECRET}'])
+        self.assertEqual(self.replacements('other/db.properties'), ['${SECRET}'])
+    
+    def test_scopes_match_by_prefix(self):
+        self.assertEqual(self.replacements(scope='text.log.java meta.line'), ['${ERROR}', '${SECRET}'])
+        self.assertEqual(self.replacements(scope='text.logfile'), ['${SECRET}'])
+    
+    def test_hide_uses_rules_for_the_file(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            env_file = os.path.join(temp_dir, '.env')
+            doc_file = os.path.join(temp_dir, 'notes.md')
+            for path in (env_file, doc_file):
+                with open(path, 'w') as f:
+                    f.write("DB_PASS=hunter2\n")
+            
+            with patch('builtins.print'):
+                self.assertEqual(hide_sensitive_text(env_file, self.patterns), 1)
+                self.assertEqual(hide_sensitive_text(doc_file, self.patterns), 0)
+            
+            with open(env_file, 'r') as f:
+                self.assertEqual(f.read(), "${DB_PASS}\n")
+        finally:
+            shutil.rmtree(temp_dir)
+    
+    def test_custom_patterns_keep_restrictions(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump([{'pattern': 'x', 'files': '*.env', 'scopes': 'source.dotenv'}], f)
+            patterns_file = f.name
+        
+        try:
+            patterns = load_custom_patterns(patterns_file)
+        finally:
+            os.remove(patterns_file)
+        
+        self.assertEqual(patterns[0]['files'], '*.env')
+        self.assertEqual(patterns[0]['scopes'], 'source.dotenv')
+
 class TestLoadCustomPatterns(unittest.TestCase):
     
     def test_load_patterns_with_string_flags(self):
@@ -345,6 +1204,48 @@ class TestMainFunction(unittest.TestCase):
                 main()
                 mock_hide.assert_called_once_with(self.temp_file_path, DEFAULT_PATTERNS)
     
+    def test_main_hide_with_chunk_size(self):
+        with patch('sensitive_text_processor.hide_sensitive_text') as mock_hide:
+            with patch('sys.argv', ['script.py', 'hide', self.temp_file_path, '--chunk-size', '4096']):
+                main()
+                mock_hide.assert_called_once_with(self.temp_file_path, DEFAULT_PATTERNS, chunk_size=4096)
+    
+    def test_streaming_hide_matches_in_memory_hide(self):
+        with open(self.temp_file_path, 'w') as f:
+            f.write("Email: test@example.com\n" * 50 + "IP 10.0.0.1 end")
+        
+        hide_sensitive_text(self.temp_file_path)
+        with open(self.temp_file_path, 'r') as f:
+            expected = f.read()
+        with open(self.temp_file_path + '.sensitive_map', 'r') as f:
+            expected_mapping = read_mapping(f)
+        reveal_sensitive_text(self.temp_file_path)
+        
+        hide_sensitive_text(self.temp_file_path, chunk_size=7)
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(f.read(), expected)
+        with open(self.temp_file_path + '.sensitive_map', 'r') as f:
+            self.assertEqual(read_mapping(f), expected_mapping)
+        self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_tmp'))
+    
+    def test_main_hide_with_workers(self):
+        with patch('sensitive_text_processor.hide_sensitive_text') as mock_hide:
+            with patch('sys.argv', ['script.py', 'hide', self.temp_file_path, '--workers', '4']):
+                main()
+                mock_hide.assert_called_once_with(self.temp_file_path, DEFAULT_PATTERNS, workers=4)
+    
+    def test_mmap_hide_falls_back_for_non_ascii_input(self):
+        with open(self.temp_file_path, 'w', encoding='utf-8') as f:
+            f.write("Café contact: test@example.com")
+        self.assertIsNone(hide_sensitive_text_mmap(self.temp_file_path))
+        
+        with open(self.temp_file_path, 'wb') as f:
+            f.write(b"line one\r\nEmail: test@example.com")
+        self.assertIsNone(hide_sensitive_text_mmap(self.temp_file_path))
+        
+        self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_backup'))
+        self.assertFalse(os.path.exists(self.temp_file_path + '.sensitive_tmp'))
+    
     @patch('sys.argv', ['script.py', 'reveal', 'test.txt'])
     @patch('os.path.exists')
     def test_main_reveal_action(self, mock_exists):
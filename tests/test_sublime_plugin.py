@@ -11,6 +11,15 @@ class MockSublimeRegion:
     def __init__(self, start, end):
         self.a = start
         self.b = end
+    
+    def begin(self):
+        return min(self.a, self.b)
+    
+    def end(self):
+        return max(self.a, self.b)
+    
+    def size(self):
+        return abs(self.b - self.a)
 
 class MockSublimeView:
     def __init__(self):
@@ -59,6 +68,9 @@ class MockWindowCommand:
 class MockEventListener:
     pass
 
+class MockTextChangeListener:
+    pass
+
 sys.modules['sublime'] = MagicMock()
 sys.modules['sublime_plugin'] = MagicMock()
 
@@ -75,6 +87,7 @@ sublime.status_message = MagicMock()
 sublime_plugin.TextCommand = MockTextCommand
 sublime_plugin.WindowCommand = MockWindowCommand
 sublime_plugin.EventListener = MockEventListener
+sublime_plugin.TextChangeListener = MockTextChangeListener
 
 import hide_sensitive_text
 sensitive_mappings = hide_sensitive_text.sensitive_mappings
@@ -186,6 +199,674 @@ class TestHideSensitiveTextCommand(unittest.TestCase):
         self.assertEqual(sensitive_mappings[self.view.id_value]['original'], "Email: test@example.com")
         self.assertIn('replacements', sensitive_mappings[self.view.id_value])
 
+class MockAsyncView(MockSublimeView):
+    def __init__(self):
+        super().__init__()
+        self._change_count = 0
+        self.status = {}
+        self.regions = {}
+        self.folded = []
+        self.viewport = (0, 0)
+        self.scope = 'text.plain'
+        self._settings = MockSublimeSettings()
+    
+    def settings(self):
+        return self._settings
+    
+    def scope_name(self, point):
+        return self.scope + ' '
+    
+    def visible_region(self):
+        return MockSublimeRegion(*self.viewport)
+    
+    def full_line(self, region):
+        start = self._content.rfind('\n', 0, region.begin()) + 1
+        end = self._content.find('\n', region.end())
+        end = len(self._content) if end == -1 else end + 1
+        return MockSublimeRegion(start, end)
+    
+    def add_regions(self, key, regions, scope='', icon='', flags=0):
+        self.regions[key] = list(regions)
+    
+    def get_regions(self, key):
+        return self.regions.get(key, [])
+    
+    def erase_regions(self, key):
+        self.regions.pop(key, None)
+    
+    def fold(self, regions):
+        self.folded.extend((region.a, region.b) for region in regions)
+    
+    def unfold(self, regions):
+        spans = [(region.a, region.b) for region in regions]
+        self.folded = [span for span in self.folded if span not in spans]
+    
+    def change_count(self):
+        return self._change_count
+    
+    def set_status(self, key, value):
+        self.status[key] = value
+    
+    def erase_status(self, key):
+        self.status.pop(key, None)
+    
+    def replace(self, edit, region, text):
+        super().replace(edit, region, text)
+        self._track_change(region.a, region.b, text)
+    
+    def insert_text(self, position, text):
+        self._content = self._content[:position] + text + self._content[position:]
+        self._track_change(position, position, text)
+    
+    def _track_change(self, start, end, text):
+        delta = len(text) - (end - start)
+        
+        def shift(point, inside):
+            if point >= end:
+                return point + delta
+            return inside if point > start else point
+        
+        for key, regions in self.regions.items():
+            self.regions[key] = [MockSublimeRegion(shift(r.a, start), shift(r.b, start + len(text))) for r in regions]
+        self.folded = [(shift(a, start), shift(b, start + len(text))) for a, b in self.folded]
+        self._change_count += 1
+        
+        listener = hide_sensitive_text.SensitiveTextChangeListener()
+        listener.buffer = Mock(views=lambda: [self])
+        change = Mock(a=Mock(pt=start), b=Mock(pt=end), str=text)
+        listener.on_text_changed([change])
+    
+    def run_command(self, command_name, args=None):
+        if command_name == 'hide_sensitive_text_on_save':
+            hide_sensitive_text.HideSensitiveTextOnSaveCommand(self).run(MagicMock())
+        elif command_name == 'apply_sensitive_text_redaction':
+            hide_sensitive_text.ApplySensitiveTextRedactionCommand(self).run(MagicMock())
+        elif command_name == 'mask_sensitive_text_impl':
+            hide_sensitive_text.MaskSensitiveTextImplCommand(self).run(MagicMock())
+        elif command_name == 'unmask_sensitive_text_impl':
+            hide_sensitive_text.UnmaskSensitiveTextImplCommand(self).run(MagicMock())
+
+def count_scans():
+    rule_set = hide_sensitive_text.load_rules()
+    return patch.object(rule_set, 'find_spans', wraps=rule_set.find_spans)
+
+class AsyncPluginTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.view = MockAsyncView()
+        sensitive_mappings.clear()
+        hide_sensitive_text.scan_jobs.clear()
+        hide_sensitive_text.mask_states.clear()
+        hide_sensitive_text.save_states.clear()
+        global_settings.settings.clear()
+        sublime.status_message.reset_mock()
+        
+        self.async_calls = []
+        self.original_timeouts = (sublime.set_timeout_async, sublime.set_timeout)
+        sublime.set_timeout_async = lambda callback, delay=0: self.async_calls.append(callback)
+        sublime.set_timeout = lambda callback, delay=0: callback()
+    
+    def tearDown(self):
+        sublime.set_timeout_async, sublime.set_timeout = self.original_timeouts
+    
+    def run_worker(self):
+        while self.async_calls:
+            self.async_calls.pop(0)()
+
+class TestRuleSetCompilation(unittest.TestCase):
+    
+    def setUp(self):
+        hide_sensitive_text.rules = None
+        global_settings.settings.clear()
+        self.async_calls = []
+        self.original_timeout = sublime.set_timeout_async
+        sublime.set_timeout_async = lambda callback, delay=0: self.async_calls.append(callback)
+    
+    def tearDown(self):
+        sublime.set_timeout_async = self.original_timeout
+        hide_sensitive_text.rules = None
+        global_settings.settings.clear()
+    
+    def test_rules_compiled_once(self):
+        rule_set = hide_sensitive_text.load_rules()
+        
+        self.assertIs(hide_sensitive_text.load_rules(), rule_set)
+        self.assertEqual(list(rule_set.find_spans("mail a@b.com"))[0][:2], (5, 12))
+    
+    def test_unrelated_setting_change_keeps_rules(self):
+        rule_set = hide_sensitive_text.load_rules()
+        global_settings.settings['auto_hide_on_save'] = True
+        
+        hide_sensitive_text.on_settings_changed()
+        
+        self.assertIs(hide_sensitive_text.rules, rule_set)
+        self.assertEqual(self.async_calls, [])
+    
+    def test_pattern_change_recompiles_in_background(self):
+        old = hide_sensitive_text.load_rules()
+        global_settings.settings['patterns'] = [{'pattern': 'secret', 'replacement': '${SECRET}'}]
+        
+        hide_sensitive_text.on_settings_changed()
+        self.assertIsNone(hide_sensitive_text.rules)
+        self.async_calls.pop(0)()
+        
+        rule_set = hide_sensitive_text.load_rules()
+        self.assertIsNot(rule_set, old)
+        self.assertEqual([span[:2] for span in rule_set.find_spans("a secret")], [(2, 8)])
+    
+    def scoped_view(self, file_name=None, scope='text.plain'):
+        view = MockAsyncView()
+        view._file_name = file_name
+        view.scope = scope
+        return view
+    
+    def test_file_globs_and_scopes_select_rules(self):
+        global_settings.settings['patterns'] = [
+            {'pattern': r'DB_PASS=\S+', 'replacement': '${DB_PASS}', 'files': ['*.env', '*.properties']},
+            {'pattern': r'ERROR \S+', 'replacement': '${ERROR}', 'scopes': 'text.log'},
+            {'pattern': 'secret', 'replacement': '${SECRET}'}
+        ]
+        
+        env_rules = hide_sensitive_text.load_rules(self.scoped_view('/app/.env'))
+        log_rules = hide_sensitive_text.load_rules(self.scoped_view('/app/server.txt', 'text.log.java'))
+        doc_rules = hide_sensitive_text.load_rules(self.scoped_view('/app/README.md', 'text.html.markdown'))
+        
+        self.assertEqual([p['replacement'] for p in env_rules.patterns], ['${DB_PASS}', '${SECRET}'])
+        self.assertEqual([p['replacement'] for p in log_rules.patterns], ['${ERROR}', '${SECRET}'])
+        self.assertEqual([p['replacement'] for p in doc_rules.patterns], ['${SECRET}'])
+    
+    def test_views_of_the_same_type_share_compiled_rules(self):
+        global_settings.settings['patterns'] = [
+            {'pattern': r'DB_PASS=\S+', 'replacement': '${DB_PASS}', 'files': '*.env'},
+            {'pattern': 'secret', 'replacement': '${SECRET}'}
+        ]
+        
+        first = hide_sensitive_text.load_rules(self.scoped_view('/one/.env'))
+        second = hide_sensitive_text.load_rules(self.scoped_view('/two/prod.env'))
+        
+        self.assertIs(first, second)
+        self.assertIs(first.prefilter, hide_sensitive_text.get_prefilter(first.patterns))
+    
+    def test_per_view_rule_sets_are_bounded(self):
+        global_settings.settings['patterns'] = [{'pattern': 'secret', 'replacement': '${SECRET}'}]
+        hide_sensitive_text.rule_sets.clear()
+        
+        for index in range(hide_sensitive_text.RULE_SET_CACHE_SIZE + 10):
+            view = self.scoped_view(f'/app/{index}.txt')
+            view._settings.set('sensitive_text_patterns', [{'pattern': f'token{index}', 'replacement': '${TOKEN}'}])
+            hide_sensitive_text.load_rules(view)
+        
+        self.assertEqual(hide_sensitive_text.rule_sets.info()['size'], hide_sensitive_text.RULE_SET_CACHE_SIZE)
+    
+    def test_project_settings_override_and_add_rules(self):
+        global_settings.settings['patterns'] = [
+            {'name': 'secret', 'pattern': 'secret', 'replacement': '${SECRET}'},
+            {'name': 'token', 'pattern': 'token', 'replacement': '${TOKEN}'},
+            {'pattern': 'password', 'replacement': '${SECRET}'}
+        ]
+        view = self.scoped_view('/app/notes.txt')
+        view._settings.set('sensitive_text_patterns', [
+            {'name': 'secret', 'pattern': 'classified', 'replacement': '${SECRET}'},
+            {'name': 'token', 'pattern': None},
+            {'pattern': 'internal', 'replacement': '${INTERNAL}'}
+        ])
+        
+        rule_set = hide_sensitive_text.load_rules(view)
+        
+        self.assertEqual([p['pattern'] for p in rule_set.patterns], ['classified', 'password', 'internal'])
+    
+    def test_unnamed_project_rules_are_added(self):
+        merged = hide_sensitive_text.merge_patterns(
+            [{'pattern': 'secret', 'replacement': '${SECRET}'}],
+            [{'pattern': 'x'}, {'pattern': 'y'}, {'pattern': 'classified', 'replacement': '${SECRET}'}]
+        )
+        
+        self.assertEqual([p['pattern'] for p in merged], ['secret', 'x', 'y', 'classified'])
+
+class TestAsyncHideSensitiveText(AsyncPluginTestCase):
+    
+    def start_hide(self, content):
+        self.view._content = content
+        hide_sensitive_text.HideSensitiveTextImplCommand(self.view).run(MagicMock())
+    
+    def test_scan_runs_off_the_ui_thread(self):
+        self.start_hide("Contact john.doe@example.com or 10.0.0.1")
+        
+        self.assertEqual(self.view._content, "Contact john.doe@example.com or 10.0.0.1")
+        self.assertIn(self.view.id_value, hide_sensitive_text.scan_jobs)
+        self.assertIn(hide_sensitive_text.STATUS_KEY, self.view.status)
+        
+        self.run_worker()
+        
+        self.assertEqual(self.view._content, "Contact ${EMAIL} or ${IP_ADDRESS}")
+        self.assertEqual(self.view.replacements, [(32, 40, "${IP_ADDRESS}"), (8, 28, "${EMAIL}")])
+        self.assertNotIn(self.view.id_value, hide_sensitive_text.scan_jobs)
+        self.assertNotIn(hide_sensitive_text.STATUS_KEY, self.view.status)
+        spans = sensitive_mappings[self.view.id_value]['spans']
+        self.assertEqual([entry['original'] for entry in spans], ["john.doe@example.com", "10.0.0.1"])
+        sublime.status_message.assert_called_with("Hidden 2 sensitive text occurrences")
+    
+    def test_cancel_command_stops_scan(self):
+        self.start_hide("Email: test@example.com")
+        
+        window = MagicMock()
+        window.active_view.return_value = self.view
+        hide_sensitive_text.CancelSensitiveTextScanCommand(window).run()
+        self.run_worker()
+        
+        self.assertEqual(self.view._content, "Email: test@example.com")
+        self.assertNotIn(self.view.id_value, hide_sensitive_text.scan_jobs)
+        sublime.status_message.assert_called_with("Hiding sensitive text cancelled")
+    
+    def test_edit_during_scan_skips_replacement(self):
+        temp_dir = tempfile.mkdtemp()
+        self.view._file_name = os.path.join(temp_dir, 'notes.txt')
+        self.start_hide("Email: test@example.com")
+        
+        self.view._change_count += 1
+        self.run_worker()
+        
+        self.assertEqual(self.view._content, "Email: test@example.com")
+        self.assertFalse(os.path.exists(self.view._file_name + '.sensitive_backup'))
+        self.assertFalse(os.path.exists(self.view._file_name + '.sensitive_map'))
+        sublime.status_message.assert_called_with("Buffer changed while scanning; sensitive text was not hidden")
+        os.rmdir(temp_dir)
+    
+    def test_second_hide_adds_to_existing_files(self):
+        temp_dir = tempfile.mkdtemp()
+        self.view._file_name = os.path.join(temp_dir, 'notes.txt')
+        self.start_hide("Email: test@example.com\n")
+        self.run_worker()
+        
+        self.view.insert_text(len(self.view._content), "Server: 10.0.0.1\n")
+        hide_sensitive_text.HideSensitiveTextImplCommand(self.view).run(MagicMock())
+        self.run_worker()
+        
+        self.assertEqual(self.view._content, "Email: ${EMAIL}\nServer: ${IP_ADDRESS}\n")
+        with open(self.view._file_name + '.sensitive_backup', 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "Email: test@example.com\nServer: 10.0.0.1\n")
+        
+        hide_sensitive_text.RevealSensitiveTextImplCommand(self.view).run(MagicMock())
+        self.assertEqual(self.view._content, "Email: test@example.com\nServer: 10.0.0.1\n")
+        self.assertEqual(os.listdir(temp_dir), [])
+        os.rmdir(temp_dir)
+    
+    def test_edit_during_second_hide_keeps_earlier_files(self):
+        temp_dir = tempfile.mkdtemp()
+        self.view._file_name = os.path.join(temp_dir, 'notes.txt')
+        self.start_hide("Email: test@example.com\n")
+        self.run_worker()
+        files = {}
+        for name in os.listdir(temp_dir):
+            with open(os.path.join(temp_dir, name), 'r', encoding='utf-8') as f:
+                files[name] = f.read()
+        
+        self.view.insert_text(len(self.view._content), "Server: 10.0.0.1\n")
+        hide_sensitive_text.HideSensitiveTextImplCommand(self.view).run(MagicMock())
+        self.view._change_count += 1
+        self.run_worker()
+        
+        self.assertEqual(sorted(files), ['notes.txt.sensitive_backup', 'notes.txt.sensitive_map'])
+        for name, text in files.items():
+            with open(os.path.join(temp_dir, name), 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), text)
+        sublime.status_message.assert_called_with("Buffer changed while scanning; sensitive text was not hidden")
+        
+        for name in files:
+            os.remove(os.path.join(temp_dir, name))
+        os.rmdir(temp_dir)
+    
+    def test_reveal_restores_only_hidden_regions(self):
+        original = "Mail a@b.com, server 10.0.0.1, done"
+        self.start_hide(original)
+        self.run_worker()
+        self.view.replacements = []
+        
+        hide_sensitive_text.RevealSensitiveTextImplCommand(self.view).run(MagicMock())
+        
+        self.assertEqual(self.view._content, original)
+        self.assertEqual([text for start, end, text in self.view.replacements], ["10.0.0.1", "a@b.com"])
+        self.assertNotIn(self.view.id_value, sensitive_mappings)
+    
+    def test_reveal_keeps_edits_made_while_hidden(self):
+        original = "Mail a@b.com here"
+        self.start_hide(original)
+        self.run_worker()
+        self.view.insert_text(0, "edited ")
+        
+        hide_sensitive_text.RevealSensitiveTextImplCommand(self.view).run(MagicMock())
+        
+        self.assertEqual(self.view._content, "edited " + original)
+    
+    def test_file_reveal_uses_mapping(self):
+        temp_dir = tempfile.mkdtemp()
+        self.view._file_name = os.path.join(temp_dir, 'notes.txt')
+        original = "token for a@b.com and c@d.org"
+        self.start_hide(original)
+        self.run_worker()
+        self.view.replacements = []
+        
+        hide_sensitive_text.RevealSensitiveTextImplCommand(self.view).run(MagicMock())
+        
+        self.assertEqual(self.view._content, original)
+        self.assertEqual(len(self.view.replacements), 2)
+        self.assertEqual(os.listdir(temp_dir), [])
+        os.rmdir(temp_dir)
+    
+    def test_reveal_from_mapping_without_backup(self):
+        global_settings.settings['create_backup'] = False
+        temp_dir = tempfile.mkdtemp()
+        self.view._file_name = os.path.join(temp_dir, 'notes.txt')
+        original = "token for a@b.com and c@d.org"
+        self.start_hide(original)
+        self.run_worker()
+        
+        self.assertEqual(os.listdir(temp_dir), ['notes.txt.sensitive_map'])
+        
+        hide_sensitive_text.RevealSensitiveTextImplCommand(self.view).run(MagicMock())
+        
+        self.assertEqual(self.view._content, original)
+        self.assertEqual(os.listdir(temp_dir), [])
+        os.rmdir(temp_dir)
+    
+    def test_large_buffer_scanned_in_chunks(self):
+        content = ("plain log line without secrets\n" * 20000) + "admin@example.com\n"
+        self.start_hide(content)
+        self.run_worker()
+        
+        self.assertTrue(self.view._content.endswith("${EMAIL}\n"))
+        self.assertEqual(len(sensitive_mappings[self.view.id_value]['spans']), 1)
+        self.assertLess(sensitive_mappings[self.view.id_value]['spans'].nbytes(), 1024)
+
+    def test_reveal_after_edit_uses_tracked_regions(self):
+        original = "Mail a@b.com here\nserver 10.0.0.1\n"
+        self.start_hide(original)
+        self.run_worker()
+        
+        self.view.insert_text(0, "note\n")
+        self.view.insert_text(len(self.view._content), "tail\n")
+        hide_sensitive_text.RevealSensitiveTextImplCommand(self.view).run(MagicMock())
+        
+        self.assertEqual(self.view._content, "note\n" + original + "tail\n")
+        self.assertEqual(self.view.get_regions(hide_sensitive_text.HIDDEN_KEY), [])
+    
+    def test_memory_limit_spills_oldest_views(self):
+        global_settings.settings['unsaved_memory_limit_mb'] = 0.001
+        first = MockAsyncView()
+        first.id_value = 1
+        first._content = "secret a@b.com " * 100
+        hide_sensitive_text.HideSensitiveTextImplCommand(first).run(MagicMock())
+        self.run_worker()
+        self.start_hide("other c@d.com")
+        self.run_worker()
+        
+        spans = sensitive_mappings[1]['spans']
+        spill_path = spans.spill_path
+        self.assertTrue(os.path.exists(spill_path))
+        self.assertIsNone(sensitive_mappings[self.view.id_value]['spans'].spill_path)
+        
+        hide_sensitive_text.RevealSensitiveTextImplCommand(first).run(MagicMock())
+        self.assertEqual(first._content, "secret a@b.com " * 100)
+        self.assertFalse(os.path.exists(spill_path))
+
+    def test_loading_spilled_view_spills_others(self):
+        global_settings.settings['unsaved_memory_limit_mb'] = 0.004
+        first = MockAsyncView()
+        first.id_value = 1
+        first._content = "secret a@b.com " * 100
+        hide_sensitive_text.HideSensitiveTextImplCommand(first).run(MagicMock())
+        self.run_worker()
+        self.start_hide("other c@d.com " * 100)
+        self.run_worker()
+        
+        first_spans = sensitive_mappings[1]['spans']
+        second_spans = sensitive_mappings[self.view.id_value]['spans']
+        self.assertIsNotNone(first_spans.spill_path)
+        self.assertIsNone(second_spans.spill_path)
+        
+        self.assertEqual(len(list(first_spans)), 100)
+        
+        self.assertIsNone(first_spans.spill_path)
+        self.assertIsNotNone(second_spans.spill_path)
+        self.assertEqual(len(list(second_spans)), 100)
+        self.assertIsNotNone(first_spans.spill_path)
+
+class TestMaskSensitiveText(AsyncPluginTestCase):
+    
+    def start_mask(self, content):
+        self.view._content = content
+        hide_sensitive_text.MaskSensitiveTextImplCommand(self.view).run(MagicMock())
+    
+    def masked_spans(self):
+        return [(start, end) for start, end, label in hide_sensitive_text.masked_spans(self.view)]
+    
+    def type_text(self, position, text):
+        self.view.insert_text(position, text)
+        hide_sensitive_text.SensitiveTextEventListener().on_modified_async(self.view)
+    
+    def test_mask_leaves_buffer_untouched(self):
+        temp_dir = tempfile.mkdtemp()
+        self.view._file_name = os.path.join(temp_dir, 'notes.txt')
+        content = "Contact john.doe@example.com or 10.0.0.1"
+        self.start_mask(content)
+        self.run_worker()
+        
+        self.assertEqual(self.view._content, content)
+        self.assertEqual(self.view.replacements, [])
+        self.assertEqual(self.masked_spans(), [(8, 28), (32, 40)])
+        self.assertEqual(self.view.folded, [(8, 28), (32, 40)])
+        self.assertIn(self.view.id_value, hide_sensitive_text.mask_states)
+        self.assertNotIn(self.view.id_value, sensitive_mappings)
+        self.assertNotIn(self.view.id_value, hide_sensitive_text.scan_jobs)
+        self.assertEqual(os.listdir(temp_dir), [])
+        sublime.status_message.assert_called_with("Masked 2 sensitive text occurrences")
+        os.rmdir(temp_dir)
+    
+    def test_mask_job_keeps_no_copy_of_text(self):
+        self.start_mask("Email: test@example.com")
+        job = hide_sensitive_text.scan_jobs[self.view.id_value]
+        self.run_worker()
+        
+        self.assertFalse(hasattr(job, 'content'))
+        self.assertEqual(job.replacements, [])
+        self.assertEqual(self.masked_spans(), [(7, 23)])
+    
+    def test_unmask_clears_regions_and_folds(self):
+        self.start_mask("Email: test@example.com")
+        self.run_worker()
+        phantoms = hide_sensitive_text.mask_states[self.view.id_value]['phantoms']['${EMAIL}']
+        
+        hide_sensitive_text.UnmaskSensitiveTextImplCommand(self.view).run(MagicMock())
+        
+        self.assertEqual(self.masked_spans(), [])
+        self.assertEqual(self.view.folded, [])
+        self.assertNotIn(self.view.id_value, hide_sensitive_text.mask_states)
+        phantoms.update.assert_called_with([])
+        sublime.status_message.assert_called_with("Sensitive text unmasked")
+    
+    def test_toggle_mask(self):
+        self.view._content = "Email: test@example.com"
+        
+        hide_sensitive_text.ToggleSensitiveMaskImplCommand(self.view).run(MagicMock())
+        self.run_worker()
+        self.assertEqual(self.masked_spans(), [(7, 23)])
+        
+        hide_sensitive_text.ToggleSensitiveMaskImplCommand(self.view).run(MagicMock())
+        self.assertEqual(self.masked_spans(), [])
+    
+    def test_visible_region_is_masked_first(self):
+        filler = "plain log line without secrets\n" * 20000
+        content = "first@example.com\n" + filler + "last@example.com\n" + filler
+        last = content.index("last@example.com")
+        self.view.viewport = (last - 500, last + 500)
+        self.start_mask(content)
+        
+        self.async_calls.pop(0)()
+        self.assertEqual(self.masked_spans(), [(last, last + 16)])
+        
+        self.run_worker()
+        self.assertEqual(self.masked_spans(), [(0, 17), (last, last + 16)])
+        sublime.status_message.assert_called_with("Masked 2 sensitive text occurrences")
+    
+    def test_scrolling_reprioritizes_batches(self):
+        filler = "plain log line without secrets\n" * 20000
+        content = "first@example.com\n" + filler + "middle@example.com\n" + filler + "last@example.com\n"
+        self.start_mask(content)
+        self.async_calls.pop(0)()
+        self.assertEqual(self.masked_spans(), [(0, 17)])
+        
+        self.view.viewport = (len(content) - 100, len(content))
+        self.async_calls.pop(0)()
+        self.assertEqual(self.masked_spans()[-1][1], len(content) - 1)
+        self.assertEqual(len(self.masked_spans()), 2)
+    
+    def test_unmask_stops_background_batches(self):
+        content = "a@b.com\n" + "plain log line without secrets\n" * 20000 + "c@d.com\n"
+        self.start_mask(content)
+        self.async_calls.pop(0)()
+        
+        hide_sensitive_text.UnmaskSensitiveTextImplCommand(self.view).run(MagicMock())
+        self.run_worker()
+        
+        self.assertEqual(self.masked_spans(), [])
+        self.assertNotIn(self.view.id_value, hide_sensitive_text.scan_jobs)
+        self.assertEqual(self.view.get_regions(hide_sensitive_text.PENDING_KEY), [])
+    
+    def test_typing_masks_new_secret_incrementally(self):
+        content = "".join(f"line {i} without secrets\n" for i in range(2000))
+        self.start_mask("Email: test@example.com\n" + content)
+        self.run_worker()
+        
+        end = len(self.view._content)
+        self.type_text(end, "contact: admin@example.com")
+        with count_scans() as scan:
+            self.run_worker()
+        
+        scanned = scan.call_args[0][0]
+        self.assertIn("admin@example.com", scanned)
+        self.assertLess(len(scanned), 200)
+        self.assertEqual(self.masked_spans(), [(7, 23), (end + 9, end + 26)])
+        self.assertIn((end + 9, end + 26), self.view.folded)
+    
+    def test_editing_secret_drops_its_mask(self):
+        self.start_mask("Email: test@example.com\nnext line\n")
+        self.run_worker()
+        
+        self.type_text(12, " ")
+        self.run_worker()
+        
+        self.assertEqual(self.view._content, "Email: test@ example.com\nnext line\n")
+        self.assertEqual(self.masked_spans(), [])
+        self.assertNotIn((7, 23), self.view.folded)
+    
+    def test_rescans_are_debounced(self):
+        self.start_mask("Email: test@example.com\n")
+        self.run_worker()
+        
+        self.type_text(24, "a")
+        self.type_text(25, "b")
+        with count_scans() as scan:
+            self.run_worker()
+        
+        self.assertEqual(scan.call_count, 1)
+    
+    def test_nothing_to_mask(self):
+        self.start_mask("nothing to see here")
+        self.run_worker()
+        
+        self.assertEqual(self.masked_spans(), [])
+        sublime.status_message.assert_called_with("No sensitive text found to mask")
+
+class TestAutoHideOnSave(AsyncPluginTestCase):
+    
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.view._file_name = os.path.join(self.temp_dir, 'notes.txt')
+        self.listener = hide_sensitive_text.SensitiveTextEventListener()
+        global_settings.settings['auto_hide_on_save'] = True
+    
+    def tearDown(self):
+        super().tearDown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+    
+    def save(self):
+        self.listener.on_pre_save(self.view)
+    
+    def test_disabled_by_default(self):
+        global_settings.settings.clear()
+        self.view._content = "Email: test@example.com"
+        self.save()
+        
+        self.assertEqual(self.view._content, "Email: test@example.com")
+        self.assertNotIn(self.view.id_value, hide_sensitive_text.save_states)
+    
+    def test_hides_before_write(self):
+        self.view._content = "Email: test@example.com"
+        self.save()
+        
+        self.assertEqual(self.view._content, "Email: ${EMAIL}")
+        with open(self.view._file_name + '.sensitive_backup', 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "Email: test@example.com")
+        sublime.status_message.assert_called_with("Hidden 1 sensitive text occurrences on save")
+    
+    def test_unchanged_save_uses_cache(self):
+        self.view._content = "Email: test@example.com\n" + "plain line\n" * 1000
+        self.save()
+        backup_mtime = os.stat(self.view._file_name + '.sensitive_backup').st_mtime_ns
+        
+        with count_scans() as scan:
+            self.save()
+        
+        self.assertEqual(scan.call_count, 0)
+        self.assertEqual(os.stat(self.view._file_name + '.sensitive_backup').st_mtime_ns, backup_mtime)
+    
+    def test_edited_save_rescans_only_changed_lines(self):
+        original = "Email: test@example.com\n" + "plain line\n" * 1000
+        self.view._content = original
+        self.save()
+        
+        self.view.insert_text(len(self.view._content), "ops: admin@example.com\n")
+        with count_scans() as scan:
+            self.save()
+        
+        self.assertLess(len(scan.call_args[0][0]), 100)
+        self.assertTrue(self.view._content.endswith("ops: ${EMAIL}\n"))
+        
+        hide_sensitive_text.RevealSensitiveTextImplCommand(self.view).run(MagicMock())
+        self.assertEqual(self.view._content, original + "ops: admin@example.com\n")
+    
+    def test_unsaved_originals_are_not_hidden(self):
+        self.view._content = "Email: test@example.com\n"
+        self.save()
+        with open(self.view._file_name + '.sensitive_backup', 'r', encoding='utf-8') as f:
+            backup = f.read()
+        
+        self.view.replace(None, MockSublimeRegion(7, 15), "${MAIL}")
+        self.view.insert_text(len(self.view._content), "ops: admin@example.com\n")
+        self.save()
+        
+        self.assertEqual(self.view._content, "Email: ${MAIL}\nops: admin@example.com\n")
+        with open(self.view._file_name + '.sensitive_backup', 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), backup)
+        sublime.status_message.assert_called_with("Sensitive text was not hidden on save; the backup could not be updated")
+    
+    def test_background_rescan_keeps_findings_current(self):
+        self.view._content = "nothing here\n"
+        self.save()
+        
+        self.view.insert_text(0, "key: a@b.com\n")
+        self.listener.on_modified_async(self.view)
+        self.run_worker()
+        
+        with count_scans() as scan:
+            self.save()
+        
+        self.assertEqual(scan.call_count, 0)
+        self.assertEqual(self.view._content, "key: ${EMAIL}\nnothing here\n")
+
 class TestRevealSensitiveTextCommand(unittest.TestCase):
     
     def setUp(self):